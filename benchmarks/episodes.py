@@ -0,0 +1,47 @@
+# Shared by the learning-speed benchmarks (planning, multistep): how many episodes a headless train() run
+# needs to reach a target success rate.
+import numpy as np
+from src.training.train import train
+import tempfile
+import time
+
+# Fast decay so the success rate measures learning rather than the exploration schedule
+DEFAULT_EXPLORATION_DECAY = 0.97
+
+
+def episodes_to_success(train_kwargs, target=0.9, window=20):
+    # Trains with train_kwargs (episodes is the cap) until the success rate over the last `window` episodes
+    # reaches target. Returns (episodes needed or None, wall time, env steps). "Episodes needed" is the
+    # episode from which the trailing success rate (over fewer than `window` episodes at the start) reached
+    # target and stayed there until the full window confirmed it, so it can be as low as 1.
+    # Success is read off the cumulative success rate, because with the step penalty a long successful
+    # episode can still end with a negative total reward. Runs write into a temporary directory, never
+    # over the stored model.
+    outcomes = []
+    successes = 0
+    reached_at = None
+
+    def callback(episode, reward, steps, success_rate, episode_time=None):
+        nonlocal successes, reached_at
+        successes_now = round(success_rate * (episode + 1))
+        outcomes.append(successes_now > successes)
+        successes = successes_now
+        trailing = np.mean(outcomes[-window:])
+        if trailing < target:
+            reached_at = None
+        elif reached_at is None:
+            reached_at = episode + 1
+        return len(outcomes) < window or trailing < target
+
+    start_time = time.time()
+    with tempfile.TemporaryDirectory() as output_dir:
+        _, metrics = train(**{'headless': True, 'q_table_backend': "array", 'log_verbosity': "off", **train_kwargs},
+                           return_metrics=True, callback=callback, output_dir=output_dir)
+    reached = len(outcomes) >= window and np.mean(outcomes[-window:]) >= target
+    return (reached_at if reached else None), time.time() - start_time, metrics['total_steps']
+
+
+def describe(target, window):
+    # Footnote for the "episodes" column of the benchmark tables
+    return (f"episodes: first episode from which the success rate over the last {window} episodes (fewer at the start) "
+            f"stayed at or above {target:.0%} until {window} episodes confirmed it; the floor is 1")
@@ -0,0 +1,50 @@
+# Steps/sec of the fused episode kernel (train_fast) against the QLearningAgent + myMazeEnv loop in train(),
+# plus late-training success rate and episode length so the two can be checked to learn the same way.
+# Run from the project root: python -m benchmarks.kernel --grid-sizes 6 10 20 --seeds 0 1 2
+import numpy as np
+from src.training.train import train
+from src.training.kernel import train_fast
+import argparse
+import tempfile
+
+
+def late_stats(metrics, tail=0.2):
+    # Success rate and mean episode length over the last `tail` fraction of episodes
+    n = max(1, int(len(metrics['rewards_history']) * tail))
+    successes = np.diff(np.asarray(metrics['success_rate']) * np.arange(1, len(metrics['success_rate']) + 1), prepend=0)
+    return successes[-n:].mean(), np.mean(metrics['steps_history'][-n:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fused episode kernel against the agent/env loop")
+    parser.add_argument('--grid-sizes', type=int, nargs='+', default=[6, 10, 20])
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0, 1, 2])
+    parser.add_argument('--episodes', type=int, default=200)
+    parser.add_argument('--exploration-decay', type=float, default=0.99)
+    args = parser.parse_args()
+    
+    print(f"{'grid':>6} {'loop':<12} {'steps/s':>10} {'speedup':>8} {'late success':>13} {'late steps':>11}")
+    # Runs write their Q-tables and metrics into a scratch directory, never over the stored model
+    with tempfile.TemporaryDirectory() as output_dir:
+        for n in args.grid_sizes:
+            common = dict(episodes=args.episodes, grid_size=(n, n), max_steps_per_episode=10 * n * n,
+                          maze_algorithm="kruskal" if n > 6 else None, exploration_decay=args.exploration_decay, output_dir=output_dir)
+            runs = {
+                'train(dict)': lambda seed: train(**common, headless=True, seed=seed, q_table_backend="dict", log_verbosity="off", return_metrics=True)[1],
+                'train(array)': lambda seed: train(**common, headless=True, seed=seed, q_table_backend="array", log_verbosity="off", return_metrics=True)[1],
+                'train_fast': lambda seed: train_fast(**common, seed=seed)[1],
+            }
+            results = {}
+            for name, run in runs.items():
+                metrics = [run(seed) for seed in args.seeds]
+                speed = sum(m['total_steps'] for m in metrics) / sum(m['total_time'] for m in metrics)
+                stats = np.mean([late_stats(m) for m in metrics], axis=0)
+                results[name] = (speed, *stats)
+            baseline = results['train(dict)'][0]
+            grid = f"{n}x{n}"
+            for name, (speed, success, steps) in results.items():
+                print(f"{grid:>6} {name:<12} {speed:>10.0f} {speed / baseline:>7.1f}x {success:>13.2%} {steps:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
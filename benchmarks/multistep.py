@@ -0,0 +1,38 @@
+# Episodes (and wall time) until one-step Q-learning vs Watkins Q(lambda) vs n-step Q-learning reach a target
+# success rate, on generated mazes of growing size where the goal reward has long corridors to travel back.
+# Run from the project root: python -m benchmarks.multistep --sizes 6 10 15 --seeds 0 1 2
+from benchmarks.episodes import episodes_to_success, describe, DEFAULT_EXPLORATION_DECAY
+import argparse
+
+CONFIGS = {
+    'one-step': dict(update_mode="one-step"),
+    'q-lambda': dict(update_mode="q-lambda", trace_decay=0.9),
+    'n-step': dict(update_mode="n-step", n_steps=8),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Q(lambda) and n-step returns against one-step Q-learning")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[6, 10, 15])
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0, 1, 2])
+    parser.add_argument('--target', type=float, default=0.9)
+    parser.add_argument('--window', type=int, default=20, help="Episodes the success rate is measured over")
+    parser.add_argument('--max-episodes', type=int, default=2000)
+    parser.add_argument('--exploration-decay', type=float, default=DEFAULT_EXPLORATION_DECAY)
+    args = parser.parse_args()
+
+    print(f"{'grid':>6} {'mode':<10} {'seed':>4} {'episodes':>9} {'env steps':>10} {'time (s)':>9}")
+    for n in args.sizes:
+        for name, config in CONFIGS.items():
+            for seed in args.seeds:
+                episodes, wall_time, env_steps = episodes_to_success(
+                    dict(episodes=args.max_episodes, grid_size=(n, n), max_steps_per_episode=4 * n * n, seed=seed,
+                         maze_algorithm="kruskal", exploration_decay=args.exploration_decay, **config),
+                    target=args.target, window=args.window)
+                print(f"{n:>3}x{n:<2} {name:<10} {seed:>4} {episodes if episodes is not None else 'never':>9} "
+                      f"{env_steps:>10} {wall_time:>9.2f}")
+    print(describe(args.target, args.window))
+
+
+if __name__ == "__main__":
+    main()
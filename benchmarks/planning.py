@@ -0,0 +1,37 @@
+# Episodes (and wall time) until plain Q-learning vs Dyna-Q vs prioritized sweeping reach a target success rate.
+# Run from the project root: python -m benchmarks.planning --grid-size 10 10 --seeds 0 1 2
+from benchmarks.episodes import episodes_to_success, describe, DEFAULT_EXPLORATION_DECAY
+import argparse
+
+CONFIGS = {
+    'q-learning': dict(planning_steps=0),
+    'dyna-q': dict(planning_steps=20, planning_mode="uniform"),
+    'prioritized': dict(planning_steps=20, planning_mode="prioritized"),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Dyna-Q planning against plain Q-learning")
+    parser.add_argument('--grid-size', type=int, nargs=2, default=(10, 10))
+    parser.add_argument('--walls', type=int, default=20)
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0, 1, 2])
+    parser.add_argument('--target', type=float, default=0.9)
+    parser.add_argument('--window', type=int, default=20, help="Episodes the success rate is measured over")
+    parser.add_argument('--max-episodes', type=int, default=2000)
+    parser.add_argument('--exploration-decay', type=float, default=DEFAULT_EXPLORATION_DECAY)
+    args = parser.parse_args()
+    
+    print(f"{'mode':<12} {'seed':>4} {'episodes':>9} {'env steps':>10} {'time (s)':>9}")
+    for name, config in CONFIGS.items():
+        for seed in args.seeds:
+            episodes, wall_time, env_steps = episodes_to_success(
+                dict(episodes=args.max_episodes, grid_size=tuple(args.grid_size), number_of_walls=args.walls, seed=seed,
+                     max_steps_per_episode=4 * args.grid_size[0] * args.grid_size[1],
+                     exploration_decay=args.exploration_decay, **config),
+                target=args.target, window=args.window)
+            print(f"{name:<12} {seed:>4} {episodes if episodes is not None else 'never':>9} {env_steps:>10} {wall_time:>9.2f}")
+    print(describe(args.target, args.window))
+
+
+if __name__ == "__main__":
+    main()
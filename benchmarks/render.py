@@ -0,0 +1,66 @@
+# Frame-time benchmark for the pygame renderer, runs without a display through the SDL dummy video driver.
+# Run from the project root: python -m benchmarks.render --grid-sizes 6 30 60
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from src.environment.Environment import myMazeEnv
+from src.environment.MazeGenerator import generate_maze
+import pygame
+import argparse
+import time
+
+
+def time_frames(env, frames):
+    # Full frame: rebuild the maze background and redraw the whole window (what every frame used to cost)
+    start = time.perf_counter()
+    for i in range(frames):
+        env._background = None
+        env._draw(0, i % env.grid_size[1])
+        pygame.display.flip()
+    full = (time.perf_counter() - start) / frames
+    
+    # Dirty frame: restore + blit the agent sprite only and update its rect
+    env._draw(0, 0)
+    pygame.display.flip()
+    start = time.perf_counter()
+    for i in range(frames):
+        pygame.display.update(env._move_agent_sprite(0, (i % (10 * env.grid_size[1])) / 10))
+    dirty = (time.perf_counter() - start) / frames
+    return full, dirty
+
+
+def time_steps(env, steps):
+    # Rendered env.step() with the fps cap lifted, i.e. pure drawing cost per step (11 frames each)
+    env.metadata = {**env.metadata, 'render_fps': 0}
+    env.reset()
+    start = time.perf_counter()
+    for i in range(steps):
+        _, _, done, _, _ = env.step(i % 4)
+        if done:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Renderer frame-time benchmark (SDL dummy driver)")
+    parser.add_argument('--grid-sizes', type=int, nargs='+', default=[6, 30, 60])
+    parser.add_argument('--cell-size', type=int, default=20)
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--steps', type=int, default=200)
+    args = parser.parse_args()
+    
+    print(f"{'grid':>6} {'full frame (ms)':>16} {'dirty frame (ms)':>17} {'speedup':>8} {'steps/s':>9}")
+    for n in args.grid_sizes:
+        env = myMazeEnv(render_mode="human", walls=generate_maze(n, n, seed=0), cell_size=args.cell_size,
+                        start_pos=(0, 0), goal_pos=(n - 1, n - 1))
+        env.reset()
+        env.render()
+        full, dirty = time_frames(env, args.frames)
+        steps_per_second = time_steps(env, args.steps)
+        grid = f"{n}x{n}"
+        print(f"{grid:>6} {full * 1e3:>16.3f} {dirty * 1e3:>17.3f} {full / dirty:>7.1f}x {steps_per_second:>9.1f}")
+        env.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# Startup benchmark: import time of the env / GUI modules and headless env construction time.
+# Imports are measured in fresh interpreters so module caching doesn't hide anything.
+# Run from the project root: python -m benchmarks.startup
+import argparse
+import json
+import subprocess
+import sys
+import timeit
+
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, 'pygame' in sys.modules, 'matplotlib' in sys.modules)
+"""
+
+
+def time_import(module, repeats):
+    # Best-of-N import time in a clean interpreter, plus whether the heavy GUI libraries got pulled in
+    best = None
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-c", IMPORT_PROBE.format(module=module)],
+                                capture_output=True, text=True, check=True).stdout.split()
+        elapsed, pygame_loaded, matplotlib_loaded = float(output[0]), output[1] == 'True', output[2] == 'True'
+        best = elapsed if best is None else min(best, elapsed)
+    return best, pygame_loaded, matplotlib_loaded
+
+
+def time_construction(grid_size, number):
+    from src.environment.Environment import myMazeEnv
+    return min(timeit.repeat(lambda: myMazeEnv(grid_size=grid_size), number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and headless construction benchmark")
+    parser.add_argument('--modules', nargs='+', default=["src.environment.Environment", "src.training.train", "src.gui.gui"])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--number', type=int, default=2000)
+    parser.add_argument('--grid-size', type=int, default=6)
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args()
+    
+    results = {'imports': {}}
+    for module in args.modules:
+        elapsed, pygame_loaded, matplotlib_loaded = time_import(module, args.repeats)
+        results['imports'][module] = {'seconds': elapsed, 'pygame': pygame_loaded, 'matplotlib': matplotlib_loaded}
+    results['construction_seconds'] = time_construction((args.grid_size, args.grid_size), args.number)
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'module':<32} {'import (ms)':>12} {'pygame':>7} {'matplotlib':>11}")
+    for module, r in results['imports'].items():
+        print(f"{module:<32} {r['seconds'] * 1e3:>12.1f} {str(r['pygame']):>7} {str(r['matplotlib']):>11}")
+    print(f"headless myMazeEnv{(args.grid_size, args.grid_size)}: {results['construction_seconds'] * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
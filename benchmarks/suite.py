@@ -0,0 +1,218 @@
+# Performance suite: env stepping, agent updates, end-to-end headless training, memory and plotting,
+# across grid sizes. Results go to JSON; `compare` flags regressions against a stored baseline.
+# Run from the project root:
+#   python -m benchmarks.suite run --out benchmarks/baseline.json
+#   python -m benchmarks.suite run --out current.json && python -m benchmarks.suite compare benchmarks/baseline.json current.json
+import numpy as np
+from src.environment.Environment import myMazeEnv
+from src.agents.agent import QLearningAgent
+from src.training.train import train
+import matplotlib
+matplotlib.use("Agg")
+from src.utils.visualize import visualize_q_table, plot_learning_curve
+import tempfile
+import tracemalloc
+import platform
+import argparse
+import random
+import json
+import time
+import sys
+import os
+
+DEFAULT_SIZES = [6, 30, 100, 300, 1000]
+
+
+def _rate(func, min_time=0.3):
+    # Calls of func per second, repeating until at least min_time has passed
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        calls += func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls / elapsed
+
+
+def _make_env(n):
+    random.seed(0)
+    return myMazeEnv(grid_size=(n, n), number_of_walls=n * n // 4, start_pos=(0, 0), goal_pos=(n - 1, n - 1))
+
+
+def bench_env_step(n):
+    env = _make_env(n)
+    actions = np.random.default_rng(0).integers(4, size=1000).tolist()
+    # Build the lookup tables outside the timed loop
+    env.step_fast(0, 0)
+    
+    def run_step():
+        env.reset()
+        for action in actions:
+            _, _, done, _, _ = env.step(action)
+            if done:
+                env.reset()
+        return len(actions)
+    
+    def run_step_fast():
+        state = env.state_index(env.start_pos)
+        for action in actions:
+            state, _, done = env.step_fast(state, action)
+            if done:
+                state = env.state_index(env.start_pos)
+        return len(actions)
+    
+    return {'env_step': (_rate(run_step), 'ops/s'), 'env_step_fast': (_rate(run_step_fast), 'ops/s')}
+
+
+def bench_agent(n):
+    results = {}
+    rng = np.random.default_rng(0)
+    states = rng.integers(n, size=(1000, 2)).tolist()
+    actions = rng.integers(4, size=1000).tolist()
+    for backend in ('dict', 'array'):
+        agent = QLearningAgent(2, 4, q_table_backend=backend, grid_size=(n, n), exploration_rate=0.1)
+        
+        def run():
+            for i in range(len(states) - 1):
+                action = agent.get_action(states[i])
+                agent.update(states[i], actions[i], -0.01, states[i + 1], False)
+            return len(states) - 1
+        
+        results[f'agent_{backend}'] = (_rate(run), 'ops/s')
+    return results
+
+
+def bench_train(n, output_dir):
+    # A fixed step budget per episode keeps big grids comparable (the goal is rarely reached there)
+    episodes = 50 if n <= 100 else 5
+    start = time.perf_counter()
+    random.seed(0)
+    _, metrics = train(episodes=episodes, grid_size=(n, n), number_of_walls=n * n // 4, max_steps_per_episode=1000,
+                       headless=True, seed=0, q_table_backend="array", log_verbosity="off", return_metrics=True,
+                       output_dir=output_dir)
+    elapsed = time.perf_counter() - start
+    return {'train_episodes': (metrics['episodes'] / elapsed, 'episodes/s'),
+            'train_steps': (metrics['steps_per_second'], 'steps/s')}
+
+
+def bench_memory(n):
+    results = {}
+    tracemalloc.start()
+    
+    # Fully populated Q-tables
+    for backend in ('dict', 'array'):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        agent = QLearningAgent(2, 4, q_table_backend=backend, grid_size=(n, n))
+        if backend == 'dict':
+            for row in range(n):
+                for col in range(n):
+                    agent.q_table[(row, col)] = np.zeros(4)
+        results[f'memory_q_{backend}'] = ((tracemalloc.get_traced_memory()[1] - before) / 1e6, 'MB')
+        del agent
+    
+    # Wall bitmask plus compiled transition/reward tables
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    env = _make_env(n)
+    env.next_state
+    results['memory_env'] = ((tracemalloc.get_traced_memory()[1] - before) / 1e6, 'MB')
+    tracemalloc.stop()
+    del env
+    return results
+
+
+def bench_plotting(n, output_dir):
+    agent = QLearningAgent(2, 4, q_table_backend="dict")
+    rng = np.random.default_rng(0)
+    for row in range(n):
+        for col in range(n):
+            agent.q_table[(row, col)] = rng.random(4)
+    history = rng.random(n * 10)
+    
+    start = time.perf_counter()
+    visualize_q_table(agent.q_table, (n, n), output_path=os.path.join(output_dir, "q_table.png"))
+    q_time = time.perf_counter() - start
+    start = time.perf_counter()
+    plot_learning_curve(history, history, history, output_path=os.path.join(output_dir, "curves.png"))
+    curve_time = time.perf_counter() - start
+    return {'plot_q_table': (q_time, 's'), 'plot_learning_curve': (curve_time, 's')}
+
+
+def run(sizes, benchmarks):
+    results = {}
+    with tempfile.TemporaryDirectory() as output_dir:
+        suites = {
+            'env': bench_env_step,
+            'agent': bench_agent,
+            'train': lambda n: bench_train(n, output_dir),
+            'memory': bench_memory,
+            'plot': lambda n: bench_plotting(n, output_dir),
+        }
+        for n in sizes:
+            for name in benchmarks:
+                for key, (value, unit) in suites[name](n).items():
+                    results[f"{key}/{n}x{n}"] = {'value': value, 'unit': unit}
+                    print(f"{key + '/' + str(n) + 'x' + str(n):<32} {value:>14.3f} {unit}", flush=True)
+    return results
+
+
+def compare(baseline, current, threshold):
+    # Rates regress when they drop, times and memory regress when they grow
+    regressions = []
+    for key, entry in current['results'].items():
+        if key not in baseline['results']:
+            continue
+        old, new = baseline['results'][key]['value'], entry['value']
+        higher_is_better = entry['unit'].endswith('/s')
+        change = (new - old) / old if old else 0.0
+        regressed = change < -threshold if higher_is_better else change > threshold
+        flag = "REGRESSION" if regressed else ""
+        print(f"{key:<32} {old:>14.3f} -> {new:>14.3f} {entry['unit']:<10} {change:>+8.1%} {flag}")
+        if regressed:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maze solver performance benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run')
+    run_parser.add_argument('--out', default="benchmark_results.json")
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    run_parser.add_argument('--benchmarks', nargs='+', default=['env', 'agent', 'train', 'memory', 'plot'],
+                            choices=['env', 'agent', 'train', 'memory', 'plot'])
+    compare_parser = commands.add_parser('compare')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1, help="Allowed relative slowdown (default 10%%)")
+    args = parser.parse_args()
+    
+    if args.command == 'run':
+        results = run(args.sizes, args.benchmarks)
+        report = {
+            'meta': {
+                'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'machine': platform.machine(),
+            },
+            'results': results,
+        }
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved in '{args.out}'")
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,16 @@
 import numpy as np
 import random
+import heapq
+from src.agents.replay import ReplayBuffer
+
+UPDATE_MODES = ("one-step", "q-lambda", "n-step")
 
 class QLearningAgent:
-    def __init__(self, state_size, action_size, learning_rate=0.1, discount_factor=0.95, exploration_rate=1.0, exploration_decay=0.995):
+    def __init__(self, state_size, action_size, learning_rate=0.1, discount_factor=0.95, exploration_rate=1.0, exploration_decay=0.995,
+                 q_table_backend="dict", grid_size=None, planning_steps=0, planning_mode="uniform", priority_threshold=1e-4,
+                 update_mode="one-step", trace_decay=0.9, n_steps=3, trace_threshold=1e-3,
+                 replay_capacity=0, replay_batch_size=256, replay_every=32, replay_mode="uniform",
+                 priority_alpha=0.6, priority_beta=0.4):
         self.state_size = state_size
         self.action_size = action_size
         self.learning_rate = learning_rate
@@ -10,24 +18,124 @@ class QLearningAgent:
         self.exploration_rate = exploration_rate
         self.exploration_decay = exploration_decay
         
+        # "dict": {(row, col): np.array(action_size)}, grows as states are visited
+        # "array": dense (rows, cols, action_size) float array, indexed directly by position
+        if q_table_backend not in ("dict", "array"):
+            raise ValueError(f"Unknown Q-table backend: {q_table_backend}")
+        if q_table_backend == "array" and grid_size is None:
+            raise ValueError("The array Q-table backend needs grid_size")
+        self.q_table_backend = q_table_backend
+        self.grid_size = grid_size
+        
         # Initialize Q-table with zeros
-        self.q_table = {}
+        if q_table_backend == "array":
+            self.q_table = np.zeros((grid_size[0], grid_size[1], action_size))
+        else:
+            self.q_table = {}
+        
+        # Dyna-Q planning: every real update is followed by planning_steps simulated backups drawn
+        # from a learned model, either uniformly or by TD-error priority (prioritized sweeping)
+        if planning_mode not in ("uniform", "prioritized"):
+            raise ValueError(f"Unknown planning mode: {planning_mode}")
+        if planning_steps and grid_size is None:
+            raise ValueError("Planning needs grid_size for its array-backed model")
+        self.planning_steps = planning_steps
+        self.planning_mode = planning_mode
+        self.priority_threshold = priority_threshold
+        if planning_steps:
+            self._init_model()
+        
+        # Multi-step credit assignment: "q-lambda" is Watkins Q(lambda) with replacing eligibility traces,
+        # "n-step" backs up n-step returns. Both cut the return at exploratory actions, so they still learn
+        # the greedy policy. They work on flat (state * action_size + action) ids of the dense table.
+        if update_mode not in UPDATE_MODES:
+            raise ValueError(f"Unknown update mode: {update_mode}")
+        if update_mode != "one-step" and q_table_backend != "array":
+            raise ValueError(f"The {update_mode} update mode needs the array Q-table backend")
+        if update_mode != "one-step" and planning_steps:
+            raise ValueError("Planning only works with one-step updates")
+        if n_steps < 1:
+            raise ValueError("n_steps must be at least 1")
+        self.update_mode = update_mode
+        self.trace_decay = trace_decay
+        self.n_steps = n_steps
+        self.trace_threshold = trace_threshold
+        if update_mode == "q-lambda":
+            self._init_traces()
+        elif update_mode == "n-step":
+            # (flat state, action, reward) of the steps whose return is not complete yet
+            self._pending = []
+            self._bootstrap_state = None
+        
+        # Experience replay: every real transition also goes into a ring buffer and every replay_every
+        # steps a minibatch of replay_batch_size stored transitions is backed up in one vectorized update
+        if replay_capacity and q_table_backend != "array":
+            raise ValueError("Experience replay needs the array Q-table backend")
+        if replay_capacity and (planning_steps or update_mode != "one-step"):
+            raise ValueError("Experience replay only works with plain one-step updates")
+        self.replay_batch_size = replay_batch_size
+        self.replay_every = replay_every
+        self.replay = ReplayBuffer(replay_capacity, mode=replay_mode, alpha=priority_alpha, beta=priority_beta) if replay_capacity else None
+        self._replay_countdown = replay_every
         
     
     def get_action(self, state):
-        state_key = self._get_state_key(state)
-        
         # Exploration: choose random action
         if random.random() < self.exploration_rate:
             return random.randint(0, self.action_size - 1)
         
+        if self.q_table_backend == "array":
+            return int(self.q_table[state[0], state[1]].argmax())
+        
+        state_key = self._get_state_key(state)
+        
         # Exploitation: choose best action from Q-table
         if state_key not in self.q_table:
             self.q_table[state_key] = np.zeros(self.action_size)
         
         return np.argmax(self.q_table[state_key])
     
+    def greedy_action(self, state):
+        # Best known action without exploration and without adding unseen states to the table
+        if self.q_table_backend == "array":
+            return int(self.q_table[state[0], state[1]].argmax())
+        q_values = self.q_table.get(self._get_state_key(state))
+        return 0 if q_values is None else int(np.argmax(q_values))
+    
     def update(self, state, action, reward, next_state, done):
+        if self.update_mode != "one-step":
+            if self.update_mode == "q-lambda":
+                self._lambda_update(state, action, reward, next_state, done)
+            else:
+                self._n_step_update(state, action, reward, next_state, done)
+            
+            if done:
+                self.exploration_rate *= self.exploration_decay
+            return
+        
+        if self.planning_steps:
+            td_error = self._backup(state, action, reward, next_state, done)
+            self._plan(state, action, reward, next_state, done, td_error)
+            
+            if done:
+                self.exploration_rate *= self.exploration_decay
+            return
+        
+        if self.q_table_backend == "array":
+            q_values = self.q_table[state[0], state[1]]
+            next_max = 0 if done else self.q_table[next_state[0], next_state[1]].max()
+            q_values[action] += self.learning_rate * (reward + self.discount_factor * next_max - q_values[action])
+            if self.replay is not None:
+                cols = self.grid_size[1]
+                self.replay.add(state[0] * cols + state[1], action, reward, next_state[0] * cols + next_state[1], done)
+                self._replay_countdown -= 1
+                if self._replay_countdown == 0:
+                    self.replay_update()
+            
+            if done:
+                self.exploration_rate *= self.exploration_decay
+            return
+        
         state_key = self._get_state_key(state)
         next_state_key = self._get_state_key(next_state)
         
@@ -52,14 +160,251 @@ class QLearningAgent:
         if done:
             self.exploration_rate *= self.exploration_decay
     
+    def end_episode(self):
+        # Called by the training loop after every episode, also after ones cut off at max_steps,
+        # which update() never hears about: traces are dropped and pending n-step returns bootstrap
+        if self.update_mode == "q-lambda":
+            self._clear_traces()
+        elif self.update_mode == "n-step" and self._pending:
+            self._n_step_backup(self._q_flat()[self._bootstrap_state].max(), len(self._pending))
+    
+    def _init_traces(self):
+        n_pairs = self.grid_size[0] * self.grid_size[1] * self.action_size
+        self._traces = np.zeros(n_pairs)
+        # Pair ids with a nonzero trace; only these are touched per step, traces below
+        # trace_threshold are dropped, so the cost follows the recent path rather than the grid
+        self._active = np.zeros(n_pairs, dtype=np.int64)
+        self._n_active = 0
+    
+    def _clear_traces(self):
+        self._traces[self._active[:self._n_active]] = 0.0
+        self._n_active = 0
+    
+    def _lambda_update(self, state, action, reward, next_state, done):
+        q_flat = self._q_flat()
+        cols = self.grid_size[1]
+        s = state[0] * cols + state[1]
+        q_row = q_flat[s]
+        # Watkins: an exploratory action ends the greedy return the earlier pairs were credited with
+        if q_row[action] < q_row.max():
+            self._clear_traces()
+        next_max = 0 if done else q_flat[next_state[0] * cols + next_state[1]].max()
+        td_error = reward + self.discount_factor * next_max - q_row[action]
+        
+        pair = s * self.action_size + action
+        if self._traces[pair] == 0.0:
+            self._active[self._n_active] = pair
+            self._n_active += 1
+        self._traces[pair] = 1.0  # replacing traces
+        active = self._active[:self._n_active]
+        traces = self._traces[active]
+        self.q_table.reshape(-1)[active] += self.learning_rate * td_error * traces
+        
+        if done:
+            self._clear_traces()
+            return
+        traces *= self.discount_factor * self.trace_decay
+        keep = traces >= self.trace_threshold
+        self._traces[active] = np.where(keep, traces, 0.0)
+        kept = active[keep]
+        self._n_active = len(kept)
+        self._active[:self._n_active] = kept
+    
+    def _n_step_update(self, state, action, reward, next_state, done):
+        q_flat = self._q_flat()
+        cols = self.grid_size[1]
+        s = state[0] * cols + state[1]
+        # An exploratory action ends the greedy returns still pending; they bootstrap from this state
+        if self._pending and q_flat[s, action] < q_flat[s].max():
+            self._n_step_backup(q_flat[s].max(), len(self._pending))
+        self._pending.append((s, action, reward))
+        self._bootstrap_state = next_state[0] * cols + next_state[1]
+        
+        if done:
+            self._n_step_backup(0.0, len(self._pending))
+        elif len(self._pending) == self.n_steps:
+            self._n_step_backup(q_flat[self._bootstrap_state].max(), 1)
+    
+    def _n_step_backup(self, bootstrap, count):
+        # Backs up the oldest `count` pending pairs towards their discounted return, each one using every
+        # reward after it plus the discounted bootstrap value at the end of the pending steps
+        q_flat = self._q_flat()
+        pending = self._pending
+        returns = []
+        g = bootstrap
+        for _, _, r in reversed(pending):
+            g = r + self.discount_factor * g
+            returns.append(g)
+        returns.reverse()
+        for (s, a, _), g in zip(pending[:count], returns):
+            q_flat[s, a] += self.learning_rate * (g - q_flat[s, a])
+        del pending[:count]
+    
+    def _init_model(self):
+        n_states = self.grid_size[0] * self.grid_size[1]
+        self._model_next = np.full((n_states, self.action_size), -1, dtype=np.int64)
+        self._model_reward = np.zeros((n_states, self.action_size))
+        self._model_done = np.zeros((n_states, self.action_size), dtype=bool)
+        # Flat (state * action_size + action) ids of every observed pair, for uniform sampling
+        self._observed = np.zeros(n_states * self.action_size, dtype=np.int64)
+        self._n_observed = 0
+        # Prioritized sweeping: max-heap of (-priority, pair id) and the observed predecessors of each state
+        self._queue = []
+        self._predecessors = {}
+    
+    def _q_row(self, state):
+        if self.q_table_backend == "array":
+            return self.q_table[state[0], state[1]]
+        state_key = self._get_state_key(state)
+        if state_key not in self.q_table:
+            self.q_table[state_key] = np.zeros(self.action_size)
+        return self.q_table[state_key]
+    
+    def _td_error(self, state, action, reward, next_state, done):
+        next_max = 0 if done else self._q_row(next_state).max()
+        return reward + self.discount_factor * next_max - self._q_row(state)[action]
+    
+    def _backup(self, state, action, reward, next_state, done):
+        # One Q-learning backup without exploration decay, returns the TD error it applied
+        td_error = self._td_error(state, action, reward, next_state, done)
+        self._q_row(state)[action] += self.learning_rate * td_error
+        return td_error
+    
+    def _plan(self, state, action, reward, next_state, done, td_error):
+        cols = self.grid_size[1]
+        s = state[0] * cols + state[1]
+        s_next = next_state[0] * cols + next_state[1]
+        pair = s * self.action_size + action
+        
+        if self._model_next[s, action] == -1:
+            self._observed[self._n_observed] = pair
+            self._n_observed += 1
+        self._model_next[s, action] = s_next
+        self._model_reward[s, action] = reward
+        self._model_done[s, action] = done
+        
+        if self.planning_mode == "uniform":
+            for pair in self._observed[np.random.randint(self._n_observed, size=self.planning_steps)].tolist():
+                s, a = divmod(pair, self.action_size)
+                self._backup(divmod(s, cols), a, self._model_reward[s, a], divmod(int(self._model_next[s, a]), cols), self._model_done[s, a])
+            return
+        
+        self._predecessors.setdefault(s_next, set()).add(pair)
+        if abs(td_error) > self.priority_threshold:
+            heapq.heappush(self._queue, (-abs(td_error), pair))
+        
+        for _ in range(self.planning_steps):
+            if not self._queue:
+                break
+            _, pair = heapq.heappop(self._queue)
+            s, a = divmod(pair, self.action_size)
+            self._backup(divmod(s, cols), a, self._model_reward[s, a], divmod(int(self._model_next[s, a]), cols), self._model_done[s, a])
+            
+            # The value of s changed, so every pair leading into s may now be worth a backup
+            for pred_pair in self._predecessors.get(s, ()):
+                ps, pa = divmod(pred_pair, self.action_size)
+                priority = abs(self._td_error(divmod(ps, cols), pa, self._model_reward[ps, pa], divmod(s, cols), self._model_done[ps, pa]))
+                if priority > self.priority_threshold:
+                    heapq.heappush(self._queue, (-priority, pred_pair))
+    
+    def get_actions(self, states):
+        # Batched epsilon-greedy over flat state indices (row * cols + col), array backend only
+        q_flat = self._q_flat()
+        greedy = q_flat[states].argmax(axis=1)
+        explore = np.random.random(len(states)) < self.exploration_rate
+        return np.where(explore, np.random.randint(self.action_size, size=len(states)), greedy)
+    
+    def update_batch(self, states, actions, rewards, next_states, dones):
+        # One vectorized Q-learning backup for a whole batch of transitions
+        self._batch_backup(states, actions, rewards, next_states, dones)
+        if self.replay is not None:
+            self.replay.add_batch(states, actions, rewards, next_states, dones)
+            self._replay_countdown -= len(states)
+            if self._replay_countdown <= 0:
+                self.replay_update()
+        
+        # Decay exploration rate once per finished episode
+        self.exploration_rate *= self.exploration_decay ** np.count_nonzero(dones)
+    
+    def replay_update(self):
+        # Backs up one minibatch sampled from the replay buffer; returns its TD errors, None while the
+        # buffer holds fewer than replay_batch_size transitions
+        self._replay_countdown = self.replay_every
+        if len(self.replay) < self.replay_batch_size:
+            return None
+        indices, states, actions, rewards, next_states, dones, weights = self.replay.sample(self.replay_batch_size)
+        td_error = self._batch_backup(states, actions, rewards, next_states, dones, weights, average_duplicates=True)
+        self.replay.update_priorities(indices, td_error)
+        return td_error
+    
+    def _batch_backup(self, states, actions, rewards, next_states, dones, weights=None, average_duplicates=False):
+        # All TD errors are taken against the table before the batch, then applied together.
+        # np.add.at accumulates the TD steps of duplicate (state, action) pairs instead of dropping them;
+        # with average_duplicates a pair moves by the mean of its steps instead, so a pair sampled many
+        # times in one replay minibatch doesn't overshoot its target.
+        q_flat = self._q_flat()
+        next_max = np.where(dones, 0.0, q_flat[next_states].max(axis=1))
+        td_error = rewards + self.discount_factor * next_max - q_flat[states, actions]
+        step = self.learning_rate * td_error if weights is None else self.learning_rate * weights * td_error
+        if average_duplicates:
+            pairs, inverse = np.unique(states * self.action_size + actions, return_inverse=True)
+            self.q_table.reshape(-1)[pairs] += np.bincount(inverse, weights=step) / np.bincount(inverse)
+        else:
+            np.add.at(q_flat, (states, actions), step)
+        return td_error
+    
+    def _q_flat(self):
+        if self.q_table_backend != "array":
+            raise ValueError("Batched actions and updates need the array Q-table backend")
+        return self.q_table.reshape(-1, self.action_size)
+    
     def save_q_table(self, filename):
+        # The dense table is a plain array, so it is saved without pickling
         np.save(filename, self.q_table)
     
     def load_q_table(self, filename):
-        self.q_table = np.load(filename, allow_pickle=True).item()
+        loaded = np.load(filename, allow_pickle=True)
+        if loaded.dtype == object:
+            loaded = loaded.item()
+        
+        # Convert between the two formats so either file works with either backend
+        if self.q_table_backend == "array":
+            if isinstance(loaded, dict):
+                loaded = q_dict_to_array(loaded, self.grid_size, self.action_size)
+            self.q_table = np.ascontiguousarray(loaded, dtype=float)
+        else:
+            self.q_table = q_array_to_dict(loaded) if isinstance(loaded, np.ndarray) else loaded
+    
+    def q_table_as_dict(self):
+        if self.q_table_backend == "array":
+            return q_array_to_dict(self.q_table)
+        return self.q_table
+    
+    def q_table_as_array(self):
+        if self.q_table_backend == "array":
+            return self.q_table
+        return q_dict_to_array(self.q_table, self.grid_size, self.action_size)
 
 
 
     def _get_state_key(self, state):
         return tuple(state)
-    
\ No newline at end of file
+
+
+def q_dict_to_array(q_table, grid_size=None, action_size=4):
+    if grid_size is None:
+        rows = max((state[0] for state in q_table), default=-1) + 1
+        cols = max((state[1] for state in q_table), default=-1) + 1
+        grid_size = (rows, cols)
+    
+    # One fancy-indexed assignment instead of a per-state loop
+    q_array = np.zeros((grid_size[0], grid_size[1], action_size))
+    if q_table:
+        states = np.array(list(q_table.keys()))
+        q_array[states[:, 0], states[:, 1]] = np.array(list(q_table.values()))
+    return q_array
+
+
+def q_array_to_dict(q_array):
+    rows, cols = q_array.shape[:2]
+    return {(row, col): q_array[row, col].copy() for row in range(rows) for col in range(cols)}
@@ -0,0 +1,85 @@
+import numpy as np
+from src.agents.agent import q_dict_to_array
+
+# Where the greedy policy ends up from a start cell
+GOAL, ENEMY, DEAD_END, LOOP = 0, 1, 2, 3
+OUTCOME_NAMES = ['goal', 'enemy', 'dead_end', 'loop']
+
+
+class GreedyPolicy:
+    # A trained Q-table compiled against the env's transition table into flat per-state arrays:
+    # the greedy action, its successor cell and the final outcome. Queries are vectorized gathers,
+    # so they never go back through QLearningAgent.get_action.
+    def __init__(self, q_table, env):
+        rows, cols = env.grid_size
+        n_states = rows * cols
+        n_actions = env.action_space.n
+        if not isinstance(q_table, np.ndarray):
+            q_table = q_dict_to_array(q_table, env.grid_size, n_actions)
+        self.grid_size = (rows, cols)
+        self.goal = env.state_index(env.goal_pos)
+        self.terminal = env.terminal.ravel()
+        
+        self.actions = np.asarray(q_table).reshape(n_states, n_actions).argmax(axis=1).astype(np.int8)
+        self.successor = env.next_state.reshape(n_states, n_actions)[np.arange(n_states), self.actions].astype(np.int64)
+        # Episodes end on terminal cells, so they are absorbing under the policy
+        self.successor[self.terminal] = np.flatnonzero(self.terminal)
+        
+        # Every state follows a single chain that ends in a cycle (terminal cells are 1-cycles).
+        # Pointer doubling jumps 2^k steps at a time; after n_states steps every chain sits on its cycle.
+        endpoint = self.successor.copy()
+        for _ in range(int(np.ceil(np.log2(max(n_states, 2)))) + 1):
+            endpoint = endpoint[endpoint]
+        self.on_cycle = np.zeros(n_states, dtype=bool)
+        self.on_cycle[endpoint] = True
+        
+        self.outcome = np.full(n_states, LOOP, dtype=np.int8)
+        stuck = self.successor[endpoint] == endpoint
+        self.outcome[stuck] = DEAD_END
+        self.outcome[self.terminal[endpoint]] = ENEMY
+        self.outcome[endpoint == self.goal] = GOAL
+        
+        self._path_cache = {}
+    
+    def _to_index(self, states):
+        # Accepts flat indices (N,) or (row, col) positions (N, 2)
+        states = np.asarray(states)
+        if states.ndim == 2:
+            return states[:, 0] * self.grid_size[1] + states[:, 1]
+        return states
+    
+    def best_actions(self, states):
+        return self.actions[self._to_index(states)]
+    
+    def outcomes(self, states):
+        return self.outcome[self._to_index(states)]
+    
+    def paths(self, starts):
+        # Full greedy paths as (length, 2) position arrays, one per start, memoized per start cell.
+        # A path stops at the goal/enemy, at a cell the policy never leaves (dead end),
+        # or on the first cell of a loop; see outcomes() for which one it was.
+        starts = self._to_index(starts).tolist()
+        missing = np.array(sorted({start for start in starts if start not in self._path_cache}), dtype=np.int64)
+        if len(missing):
+            # All missing starts walk in lockstep until each one reaches its cycle
+            trail = [missing]
+            current = missing
+            active = ~self.on_cycle[current]
+            while active.any():
+                current = np.where(active, self.successor[current], current)
+                trail.append(current)
+                active = ~self.on_cycle[current]
+            trail = np.stack(trail, axis=1)
+            lengths = (np.diff(trail, axis=1) != 0).sum(axis=1) + 1
+            cols = self.grid_size[1]
+            for i, start in enumerate(missing.tolist()):
+                self._path_cache[start] = np.stack(np.divmod(trail[i, :lengths[i]], cols), axis=1)
+        return [self._path_cache[start] for start in starts]
+    
+    def path_lengths(self, starts):
+        # Steps to the goal from each start, -1 where the greedy policy never gets there
+        starts = self._to_index(starts)
+        lengths = np.full(len(starts), -1, dtype=np.int64)
+        reaches_goal = self.outcome[starts] == GOAL
+        lengths[reaches_goal] = [len(path) - 1 for path in self.paths(starts[reaches_goal])]
+        return lengths
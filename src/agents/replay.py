@@ -0,0 +1,123 @@
+import numpy as np
+
+REPLAY_MODES = ("uniform", "prioritized")
+
+
+class SumTree:
+    # Binary tree over `capacity` leaf priorities in one flat array: node i has children 2i and 2i + 1,
+    # leaves start at self.size and the root (index 1) holds the total. Updates and sampling work on whole
+    # batches, one numpy operation per tree level.
+    def __init__(self, capacity):
+        self.size = 1 << max(0, int(capacity - 1).bit_length())
+        self.depth = self.size.bit_length() - 1
+        self.tree = np.zeros(2 * self.size)
+
+    @property
+    def total(self):
+        return self.tree[1]
+
+    def update(self, leaves, priorities):
+        # A leaf given twice keeps its last priority. Parents shared by several leaves are recomputed
+        # once per leaf, but every write stores the same sum, so no deduplication is needed.
+        nodes = np.asarray(leaves, dtype=np.int64) + self.size
+        self.tree[nodes] = priorities
+        for _ in range(self.depth):
+            nodes >>= 1
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, values):
+        # Leaf whose cumulative priority range contains each value in [0, total)
+        values = np.array(values, dtype=float)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = values >= left_sum
+            values -= np.where(go_right, left_sum, 0.0)
+            nodes = left + go_right
+        return nodes - self.size
+
+    def priorities(self, leaves):
+        return self.tree[np.asarray(leaves) + self.size]
+
+
+class ReplayBuffer:
+    # Fixed-capacity ring of (state, action, reward, next state, done) transitions in preallocated arrays,
+    # states as flat indices (row * cols + col). The oldest transition is overwritten once it is full.
+    # "prioritized" samples in proportion to |TD error| ** alpha through a sum-tree and returns importance
+    # weights ((size * P(i)) ** -beta, scaled to max 1). New transitions get the largest priority seen so
+    # far; their tree leaves are written in one batch just before the next sample, so add() stays O(1).
+    def __init__(self, capacity, mode="uniform", alpha=0.6, beta=0.4, epsilon=1e-3):
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"Unknown replay mode: {mode}")
+        self.capacity = capacity
+        self.mode = mode
+        self.alpha = alpha
+        self.beta = beta
+        self.epsilon = epsilon
+        self.states = np.zeros(capacity, dtype=np.int64)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity)
+        self.next_states = np.zeros(capacity, dtype=np.int64)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.position = 0
+        self.size = 0
+        if mode == "prioritized":
+            self._tree = SumTree(capacity)
+            self._max_priority = 1.0
+            self._new = []
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, done):
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        if self.mode == "prioritized":
+            self._new.append(i)
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        # Vectorized add, e.g. one step of every env of a VectorMazeEnv
+        n = len(states)
+        slots = (self.position + np.arange(n)) % self.capacity
+        self.states[slots] = states
+        self.actions[slots] = actions
+        self.rewards[slots] = rewards
+        self.next_states[slots] = next_states
+        self.dones[slots] = dones
+        self.position = int((self.position + n) % self.capacity)
+        self.size = min(self.size + n, self.capacity)
+        if self.mode == "prioritized":
+            self._new.extend(slots.tolist())
+
+    def sample(self, batch_size):
+        # (indices, states, actions, rewards, next_states, dones, weights); weights is None for uniform sampling
+        if self.mode == "uniform":
+            indices = np.random.randint(self.size, size=batch_size)
+            weights = None
+        else:
+            if self._new:
+                self._tree.update(self._new, self._max_priority ** self.alpha)
+                self._new = []
+            # Stratified: one draw from each of batch_size equal slices of the total priority
+            total = self._tree.total
+            values = (np.arange(batch_size) + np.random.random(batch_size)) * (total / batch_size)
+            indices = np.minimum(self._tree.find(values), self.size - 1)
+            probabilities = self._tree.priorities(indices) / total
+            weights = (self.size * probabilities) ** -self.beta
+            weights /= weights.max()
+        return (indices, self.states[indices], self.actions[indices], self.rewards[indices],
+                self.next_states[indices], self.dones[indices], weights)
+
+    def update_priorities(self, indices, td_errors):
+        if self.mode != "prioritized":
+            return
+        priorities = np.abs(td_errors) + self.epsilon
+        self._max_priority = max(self._max_priority, float(priorities.max()))
+        self._tree.update(indices, priorities ** self.alpha)
@@ -0,0 +1,103 @@
+import numpy as np
+from collections import deque
+from src.agents.agent import q_array_to_dict
+
+# Model-based baselines computed straight from myMazeEnv's compiled tables (next_state, reward_table, terminal)
+
+
+def bfs_distances(env, goal_pos=None):
+    # Shortest number of steps from every cell to the goal, -1 where the goal is unreachable.
+    # Walls are always set on both sides of a cell border, so moves are reversible and a BFS
+    # outwards from the goal over the forward transitions gives distances *to* the goal.
+    goal_pos = env.goal_pos if goal_pos is None else goal_pos
+    rows, cols = env.grid_size
+    next_state = env.next_state.reshape(rows * cols, -1).tolist()
+    terminal = env.terminal.ravel().tolist()
+    
+    distances = [-1] * (rows * cols)
+    goal = env.state_index(goal_pos)
+    distances[goal] = 0
+    queue = deque([goal])
+    while queue:
+        state = queue.popleft()
+        # Paths cannot run through the enemy (or any other terminal cell)
+        if terminal[state] and state != goal:
+            continue
+        for neighbour in next_state[state]:
+            if distances[neighbour] == -1:
+                distances[neighbour] = distances[state] + 1
+                queue.append(neighbour)
+    
+    # Terminal cells other than the goal end the episode, they never lead anywhere
+    distances = np.array(distances).reshape(rows, cols)
+    distances[env.terminal & (distances != 0)] = -1
+    return distances
+
+
+def value_iteration(env, discount_factor=0.95, tol=1e-10, max_iterations=100000):
+    # Optimal Q[r, c, a] for the deterministic maze, in the same (rows, cols, n_actions) layout as the
+    # array Q-table backend. Terminal cells keep Q = 0, exactly like the `done` backup in QLearningAgent.
+    rows, cols = env.grid_size
+    next_state = env.next_state.reshape(rows * cols, -1)
+    reward = env.reward_table.ravel()
+    terminal = env.terminal.ravel()
+    continues = ~terminal
+    
+    # Start from the shortest-path values so only enemy detours and unreachable cells still need sweeps
+    distances = bfs_distances(env).ravel()
+    step_reward = reward[~terminal].max() if continues.any() else 0.0
+    values = np.full(rows * cols, step_reward / (1 - discount_factor))
+    reachable = distances > 0
+    steps_before_goal = distances[reachable] - 1
+    values[reachable] = step_reward * (1 - discount_factor ** steps_before_goal) / (1 - discount_factor) \
+        + discount_factor ** steps_before_goal * reward[env.state_index(env.goal_pos)]
+    values[terminal] = 0.0
+    
+    for _ in range(max_iterations):
+        q_values = reward[next_state] + discount_factor * continues[next_state] * values[next_state]
+        new_values = np.where(terminal, 0.0, q_values.max(axis=1))
+        delta = np.abs(new_values - values).max()
+        values = new_values
+        if delta < tol:
+            break
+    
+    q_values = reward[next_state] + discount_factor * continues[next_state] * values[next_state]
+    q_values[terminal] = 0.0
+    return q_values.reshape(rows, cols, -1)
+
+
+def optimal_q_table(env, discount_factor=0.95, backend="array"):
+    q_array = value_iteration(env, discount_factor=discount_factor)
+    return q_array if backend == "array" else q_array_to_dict(q_array)
+
+
+def greedy_path_length(env, q_table, start_pos=None, max_steps=None):
+    # Steps the greedy policy of q_table (array or dict) needs to reach the goal, None if it never does
+    start_pos = env.start_pos if start_pos is None else start_pos
+    rows, cols = env.grid_size
+    max_steps = rows * cols if max_steps is None else max_steps
+    goal = env.state_index(env.goal_pos)
+    
+    state = env.state_index(start_pos)
+    for step in range(max_steps):
+        row, col = divmod(state, cols)
+        if isinstance(q_table, np.ndarray):
+            action = int(q_table[row, col].argmax())
+        else:
+            q_values = q_table.get((row, col))
+            action = 0 if q_values is None else int(np.argmax(q_values))
+        state, _, done = env.step_fast(state, action)
+        if done:
+            return step + 1 if state == goal else None
+    return None
+
+
+def optimality_gap(env, q_table, start_pos=None, distances=None):
+    # Extra steps the greedy policy takes over the shortest path; None if it fails or no path exists
+    start_pos = env.start_pos if start_pos is None else start_pos
+    distances = bfs_distances(env) if distances is None else distances
+    shortest = distances[start_pos]
+    if shortest < 0:
+        return None
+    length = greedy_path_length(env, q_table, start_pos)
+    return None if length is None else length - int(shortest)
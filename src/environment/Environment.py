@@ -8,9 +8,43 @@ Created on Mon Apr 21 21:57:17 2025
 import gym
 from gym import spaces
 import numpy as np
-import pygame
 import random
 import os
+from time import perf_counter
+from src.environment.MazeGenerator import OPPOSITE
+from src.utils.lazy_import import lazy_import
+
+# pygame is only imported once something is actually drawn, headless envs never load it
+pygame = lazy_import("pygame", globals())
+
+# Process-wide caches: sprites scaled per cell_size, observation bounds per grid size
+_SPRITE_CACHE = {}
+_OBSERVATION_BOUNDS = {}
+
+
+def _load_sprites(cell_size):
+    # (agent, goal, enemy) sprites resized to fit cell_size, loaded from disk once per process
+    if cell_size not in _SPRITE_CACHE:
+        if 'originals' not in _SPRITE_CACHE:
+            # Get the project root directory (two levels up from this file)
+            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            _SPRITE_CACHE['originals'] = [pygame.image.load(os.path.join(project_root, "assets", name))
+                                          for name in ("jerry.png", "cheese.png", "tom.png")]
+        _SPRITE_CACHE[cell_size] = [pygame.transform.scale(image, (cell_size, cell_size))
+                                    for image in _SPRITE_CACHE['originals']]
+    return _SPRITE_CACHE[cell_size]
+
+
+def _observation_space(grid_size):
+    # Only the (read-only) bounds are shared: every env gets its own Box, since a Box carries its own
+    # np_random and writable low/high copies that seed() and sample() must not leak between envs
+    if grid_size not in _OBSERVATION_BOUNDS:
+        low = np.zeros(2, dtype=np.int32)
+        high = np.array([grid_size[0] - 1, grid_size[1] - 1], dtype=np.int32)
+        low.flags.writeable = high.flags.writeable = False
+        _OBSERVATION_BOUNDS[grid_size] = (low, high)
+    low, high = _OBSERVATION_BOUNDS[grid_size]
+    return spaces.Box(low=low, high=high, dtype=np.int32)
 
 class myMazeEnv(gym.Env):
     # This is a standard attribute in Gym environments.
@@ -19,9 +53,13 @@ class myMazeEnv(gym.Env):
     metadata = {'render_modes': ['human'], 'render_fps': 100}
 
     # “dunder” (short for double underscore) automatically called when you create an instance of a class.
-    def __init__(self, render_mode=None, grid_size=(6,6), number_of_walls=10, cell_size=80):
+    def __init__(self, render_mode=None, grid_size=(6,6), number_of_walls=10, cell_size=80,
+                 start_pos=None, goal_pos=None, enemy_pos=None, walls=None):
         super().__init__()      # Make sure the Gym engine is running before I start customizing my maze.
-        self.grid_size = grid_size              # n*n maze
+        # A generated wall bitmask (see MazeGenerator) fixes the maze and its size
+        if walls is not None:
+            grid_size = walls.shape
+        self.grid_size = tuple(grid_size)       # rows*cols maze
         self.grid = np.zeros(self.grid_size, dtype=int)             # All cells free
         
         # initial pos
@@ -31,7 +69,7 @@ class myMazeEnv(gym.Env):
 
         
         self.action_space = spaces.Discrete(4)
-        self.observation_space = spaces.Box(low=0, high=self.grid_size[0]-1, shape=(2,), dtype=np.int32)
+        self.observation_space = _observation_space(self.grid_size)
         
         self.actions = {
             0: (-1, 0),  # up
@@ -45,32 +83,31 @@ class myMazeEnv(gym.Env):
         self.render_mode = render_mode
         self.window = None
         self.clock = None
+        # Optional PhaseTimer (see src.utils.profiling) that gets the render time of every step
+        self.profiler = None
+        self._agent_rect = None
+        self._full_update_pending = False
         
-        # Get the project root directory (two levels up from this file)
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        # agent, goal & enemy sprites, loaded from the shared cache when the window opens
+        self.agent_img = self.goal_img = self.enemy_img = None
         
-        # agent, goal & enemy as sprite
-        self.agent_img = pygame.image.load(os.path.join(project_root, "assets", "jerry.png"))
-        self.goal_img = pygame.image.load(os.path.join(project_root, "assets", "cheese.png"))
-        self.enemy_img = pygame.image.load(os.path.join(project_root, "assets", "tom.png"))
+        # Compiled next_state / reward / terminal tables, rebuilt lazily whenever walls or goal/enemy change
+        self.invalidate_tables()
         
-        # Optional: resize images to fit cell size
-        self.agent_img = pygame.transform.scale(self.agent_img, (self.cell_size, self.cell_size))
-        self.goal_img = pygame.transform.scale(self.goal_img, (self.cell_size, self.cell_size))
-        self.enemy_img = pygame.transform.scale(self.enemy_img, (self.cell_size, self.cell_size))
+        # Wall structure: uint8 bitmask per cell, bit a set = wall on side self.cell_side[a] (top, bottom, left, right)
+        if walls is not None:
+            self.walls = np.array(walls, dtype=np.uint8)
+        else:
+            self.walls = np.zeros(self.grid_size, dtype=np.uint8)
+            for w in range(number_of_walls):
+                self._random_walls()
         
-        # Wall structure: walls on each cell side (top, bottom, left, right)
-        self.cell_walls = {}  # {(row, col): {"top": True, "right": False, ...}}
-
-        mazeRows, mazeColumns = self.grid_size
-        for i in range(mazeRows):
-            for j in range(mazeColumns):
-                self.cell_walls[(i, j)] = {"top": False, "bottom": False, "left": False, "right": False}
-
-        for w in range(number_of_walls):
-            self._random_walls()
+        # Programmatic placement (headless runs / config files) instead of mouse clicks
+        self.goal_pos = None
+        self.enemy_pos = None
+        self._place_positions(start_pos, goal_pos, enemy_pos)
             
-        if render_mode == "human":
+        if render_mode == "human" and start_pos is None:
             self.render()                   # show initial grid
             self._setup_mode()
 
@@ -85,24 +122,66 @@ class myMazeEnv(gym.Env):
 
     def step(self, action):
         self.previous_pos = self.agent_pos
-        move = self.actions[action]
-        new_pos = (self.agent_pos[0] + move[0], self.agent_pos[1] + move[1])
+        next_index, reward, done = self.step_fast(self.state_index(self.agent_pos), action)
+        self.agent_pos = divmod(next_index, self.grid_size[1])
 
-        if self._is_valid(new_pos) and not self._is_wall(self.agent_pos, new_pos, action):
-            self.agent_pos = new_pos
-
-        cell_value = self.grid[self.agent_pos]
-        if cell_value == 2:
-            reward = 1.0
-        elif cell_value == -2:
-            reward = -1.0
+        if self.profiler is None:
+            self.render()
         else:
-            reward = -0.01
-            
-        done = (cell_value == 2) or (cell_value == -2)
-
-        self.render()
+            render_start = perf_counter()
+            self.render()
+            self.profiler.add_render(render_start, perf_counter())
         return np.array(self.agent_pos), reward, done, False, {}    # False: not important now, {}: should be prob
+    
+    def step_fast(self, state_index, action):
+        # Pure table lookup on flat state indices: no rendering, no agent_pos bookkeeping
+        if self._next_state_list is None:
+            self._build_lookup_lists()
+        next_index = self._next_state_list[state_index][action]
+        return next_index, self._reward_list[next_index], self._terminal_list[next_index]
+    
+    def state_index(self, pos):
+        return pos[0] * self.grid_size[1] + pos[1]
+    
+    def state_position(self, state_index):
+        return divmod(state_index, self.grid_size[1])
+    
+    # next_state[r, c, a] holds the flat index reached from (r, c) with action a,
+    # reward[r, c] / terminal[r, c] describe entering cell (r, c)
+    @property
+    def next_state(self):
+        if self._tables_dirty:
+            self._build_tables()
+        return self._next_state
+    
+    @property
+    def reward_table(self):
+        if self._tables_dirty:
+            self._build_tables()
+        return self._reward
+    
+    @property
+    def terminal(self):
+        if self._tables_dirty:
+            self._build_tables()
+        return self._terminal
+    
+    def invalidate_tables(self):
+        # Call after editing self.grid or self.walls directly (also drops the cached render background)
+        self._tables_dirty = True
+        self._next_state_list = None
+        self._cell_walls = None
+        self._background = None
+    
+    @property
+    def cell_walls(self):
+        # Read-only {(row, col): {"top": bool, ...}} view of the bitmask for older callers, built on first
+        # access and cached until the walls change
+        if self._cell_walls is None:
+            rows, cols = self.grid_size
+            self._cell_walls = {(i, j): {side: bool(self.walls[i, j] >> bit & 1) for bit, side in enumerate(self.cell_side)}
+                                for i in range(rows) for j in range(cols)}
+        return self._cell_walls
      
     
     def render(self):
@@ -116,6 +195,7 @@ class myMazeEnv(gym.Env):
             )
             pygame.display.set_caption("Maze")
             self.clock = pygame.time.Clock()
+            self.agent_img, self.goal_img, self.enemy_img = _load_sprites(self.cell_size)
             
         self._animate_agent(self.previous_pos, self.agent_pos)
         return
@@ -125,72 +205,100 @@ class myMazeEnv(gym.Env):
         if self.window is not None:
             pygame.quit()
             self.window = None
+            self._background = None
+            self._agent_rect = None
         return
     
     
     
     def _random_walls(self):
-        n = self.grid_size[0]-1
+        last_row, last_col = self.grid_size[0] - 1, self.grid_size[1] - 1
         # top, bottom, left, right
         randomSide = random.randint(0, 3)
         
         # available cells with this side
         cells_for_side = {
-            0 : [random.randint(1, n), random.randint(0, n)], 
-            1 : [random.randint(0, n-1), random.randint(0, n)], 
-            2 : [random.randint(0, n), random.randint(1, n)], 
-            3 : [random.randint(0, n), random.randint(0, n-1)]
+            0 : [random.randint(1, last_row), random.randint(0, last_col)], 
+            1 : [random.randint(0, last_row-1), random.randint(0, last_col)], 
+            2 : [random.randint(0, last_row), random.randint(1, last_col)], 
+            3 : [random.randint(0, last_row), random.randint(0, last_col-1)]
         }
         randomRow, randomCol = cells_for_side[randomSide]
         # print("----------", randomRow, randomCol, randomSide)
         
-        # set wall for cells
-        side = self.cell_side
-        if randomSide == 0:
-            self.cell_walls[(randomRow, randomCol)][side[0]] = True
-            self.cell_walls[(randomRow-1, randomCol)][side[1]] = True
-            
-        elif randomSide == 1:
-            self.cell_walls[(randomRow, randomCol)][side[1]] = True
-            self.cell_walls[(randomRow+1, randomCol)][side[0]] = True
-            
-        elif randomSide == 2:
-            self.cell_walls[(randomRow, randomCol)][side[2]] = True
-            self.cell_walls[(randomRow, randomCol-1)][side[3]] = True
-            
-        elif randomSide == 3:
-            self.cell_walls[(randomRow, randomCol)][side[3]] = True
-            self.cell_walls[(randomRow, randomCol+1)][side[2]] = True
+        # set wall for both cells sharing the side
+        move = self.actions[randomSide]
+        bit = 1 << randomSide
+        self.walls[randomRow, randomCol] |= bit
+        self.walls[randomRow + move[0], randomCol + move[1]] |= OPPOSITE[bit]
+        
+        self.invalidate_tables()
+        
+    
+    def _build_tables(self):
+        rows, cols = self.grid_size
+        n_actions = self.action_space.n
+        row_idx, col_idx = np.indices((rows, cols))
+        
+        blocked = (self.walls[:, :, None] >> np.arange(n_actions, dtype=np.uint8) & 1).astype(bool)
+        
+        # int32 halves the table size and still indexes mazes far beyond 2000x2000
+        next_state = np.empty((rows, cols, n_actions), dtype=np.int32)
+        for action, (dr, dc) in self.actions.items():
+            new_row, new_col = row_idx + dr, col_idx + dc
+            can_move = (new_row >= 0) & (new_row < rows) & (new_col >= 0) & (new_col < cols) & ~blocked[:, :, action]
+            next_state[:, :, action] = np.where(can_move, new_row * cols + new_col, row_idx * cols + col_idx)
         
+        reward = np.full((rows, cols), -0.01)
+        reward[self.grid == 2] = 1.0
+        reward[self.grid == -2] = -1.0
+        
+        self._next_state = next_state
+        self._reward = reward
+        self._terminal = (self.grid == 2) | (self.grid == -2)
+        self._tables_dirty = False
+    
+    def _build_lookup_lists(self):
+        # Flat Python lists make single lookups in step_fast cheaper than NumPy scalar indexing.
+        # Built on first use only, since they cost far more memory than the arrays on big mazes.
+        if self._tables_dirty:
+            self._build_tables()
+        self._next_state_list = self._next_state.reshape(self._next_state.shape[0] * self._next_state.shape[1], -1).tolist()
+        self._reward_list = self._reward.ravel().tolist()
+        self._terminal_list = self._terminal.ravel().tolist()
+    
+    def _place_positions(self, start_pos, goal_pos, enemy_pos):
+        placed = [tuple(p) for p in (start_pos, goal_pos, enemy_pos) if p is not None]
+        for pos in placed:
+            if not self._is_valid(pos):
+                raise ValueError(f"Position {pos} is outside the {self.grid_size} grid")
+        if len(set(placed)) != len(placed):
+            raise ValueError("Start, goal and enemy positions must be different cells")
+
+        if start_pos is not None:
+            self.start_pos = tuple(start_pos)
+            self.agent_pos = self.start_pos
+            self.previous_pos = self.start_pos
+        if goal_pos is not None:
+            self.goal_pos = tuple(goal_pos)
+            self.grid[self.goal_pos] = 2
+        if enemy_pos is not None:
+            self.enemy_pos = tuple(enemy_pos)
+            self.grid[self.enemy_pos] = -2
+        self.invalidate_tables()
     
     def _is_valid(self, pos):
         x, y = pos
         return 0 <= x < self.grid.shape[0] and 0 <= y < self.grid.shape[1]
 
-    def _is_wall(self, from_pos, to_pos, action):
-        fr, fc = from_pos
-        tr, tc = to_pos
-        side = ["top", "bottom", "left", "right"]
-        
-        if fr == tr or fc == tc:
-            return self.cell_walls[(fr, fc)][side[action]]  # (fr, fc) cell dimension
-        return True                                         # Not adjacent = not allowed
-            
-        """
-        another sol.
-        if fr == tr and fc == tc + 1:       # fr == tr : same row, fc == tc + 1 : go left
-            return self.cell_walls[(fr, fc)]["left"]
-        if fr == tr and fc == tc - 1:
-            return self.cell_walls[(fr, fc)]["right"]
-        if fr == tr + 1 and fc == tc:
-            return self.cell_walls[(fr, fc)]["top"]
-        if fr == tr - 1 and fc == tc:
-            return self.cell_walls[(fr, fc)]["bottom"]
-        return True  # Not adjacent = not allowed
-        """        
-
-    
     def _animate_agent(self, from_pos, to_pos, steps=10):
+        # First frame or the maze changed: one full redraw from the (re)built background
+        if self._background is None or self._agent_rect is None:
+            self._draw(from_pos[0], from_pos[1])
+        if self._full_update_pending:
+            pygame.display.flip()
+            self._full_update_pending = False
+        
         for i in range(steps + 1):
             # prevent freezing when(Clicking, Moving or resizing)
             pygame.event.pump() # I don’t care what the events are, but just... acknowledge them so my app doesn’t freeze!
@@ -198,41 +306,59 @@ class myMazeEnv(gym.Env):
             x = from_pos[1] + (to_pos[1] - from_pos[1]) * i / steps
             y = from_pos[0] + (to_pos[0] - from_pos[0]) * i / steps
             
-            self._draw(y, x)
-            # updates the screen so you can see what you just drew
-            pygame.display.flip()
+            # only the area the sprite left and entered is sent to the screen
+            pygame.display.update(self._move_agent_sprite(y, x))
             # Waits just long enough to make sure the loop doesn’t run faster than fps
             self.clock.tick(self.metadata["render_fps"])   # wait so you get about (20) frames per second
 
     def _draw(self, agent_row, agent_col):
-        self.window.fill((0, 0, 0))  # (R, G, B)
+        # Full frame: cached maze background + agent sprite (caller flips the display)
+        if self._background is None:
+            self._background = self._draw_background()
+        self.window.blit(self._background, (0, 0))
+        
+        # agent sprite
+        self._agent_rect = pygame.Rect(int(agent_col * self.cell_size), int(agent_row * self.cell_size), self.cell_size, self.cell_size)
+        self.window.blit(self.agent_img, self._agent_rect.topleft)
+        self._full_update_pending = True
+    
+    def _move_agent_sprite(self, agent_row, agent_col):
+        # Restore the background under the old sprite position and blit the sprite at the new one,
+        # returning the dirty rect for pygame.display.update
+        old_rect = self._agent_rect
+        self._agent_rect = pygame.Rect(int(agent_col * self.cell_size), int(agent_row * self.cell_size), self.cell_size, self.cell_size)
+        self.window.blit(self._background, old_rect, old_rect)
+        self.window.blit(self.agent_img, self._agent_rect.topleft)
+        return [old_rect.union(self._agent_rect)]
+    
+    def _draw_background(self):
+        # Everything except the agent, drawn once and reused until walls or goal/enemy change
+        background = pygame.Surface(self.window.get_size())
+        background.fill((0, 0, 0))  # (R, G, B)
         cs = self.cell_size
 
-        for (y, x), walls in self.cell_walls.items():
+        for (y, x), walls in np.ndenumerate(self.walls):
             rect = pygame.Rect(x * cs, y * cs, cs, cs)
 
             # Cells color
-            pygame.draw.rect(self.window, (50, 50, 50), rect)
+            pygame.draw.rect(background, (50, 50, 50), rect)
             
             # goal & enemy sprite
             if self.grid[y, x] == 2:
-                self.window.blit(self.goal_img, rect.topleft)
+                background.blit(self.goal_img, rect.topleft)
             elif self.grid[y, x] == -2:
-                self.window.blit(self.enemy_img, rect.topleft)
+                background.blit(self.enemy_img, rect.topleft)
 
             # Wall borders
-            if walls["top"]:
-                pygame.draw.line(self.window, (255, 255, 255), (x * cs, y * cs), ((x + 1) * cs, y * cs), 2)
-            if walls["bottom"]:
-                pygame.draw.line(self.window, (255, 255, 255), (x * cs, (y + 1) * cs), ((x + 1) * cs, (y + 1) * cs), 2)
-            if walls["left"]:
-                pygame.draw.line(self.window, (255, 255, 255), (x * cs, y * cs), (x * cs, (y + 1) * cs), 2)
-            if walls["right"]:
-                pygame.draw.line(self.window, (255, 255, 255), ((x + 1) * cs, y * cs), ((x + 1) * cs, (y + 1) * cs), 2)
-
-        # agent sprite
-        agent_rect = pygame.Rect(int(agent_col * self.cell_size), int(agent_row * self.cell_size), self.cell_size, self.cell_size)
-        self.window.blit(self.agent_img, agent_rect.topleft)
+            if walls & 1:
+                pygame.draw.line(background, (255, 255, 255), (x * cs, y * cs), ((x + 1) * cs, y * cs), 2)
+            if walls & 2:
+                pygame.draw.line(background, (255, 255, 255), (x * cs, (y + 1) * cs), ((x + 1) * cs, (y + 1) * cs), 2)
+            if walls & 4:
+                pygame.draw.line(background, (255, 255, 255), (x * cs, y * cs), (x * cs, (y + 1) * cs), 2)
+            if walls & 8:
+                pygame.draw.line(background, (255, 255, 255), ((x + 1) * cs, y * cs), ((x + 1) * cs, (y + 1) * cs), 2)
+        return background
         
 
     def _setup_mode(self):
@@ -248,12 +374,14 @@ class myMazeEnv(gym.Env):
         self.goal_pos = self._wait_for_click()
         
         self.grid[self.goal_pos] = 2
+        self.invalidate_tables()
         self.render()
         
         print("Click to select Tom position...")
         self.enemy_pos = self._wait_for_click()
         
         self.grid[self.enemy_pos] = -2
+        self.invalidate_tables()
         self.render()
         
         
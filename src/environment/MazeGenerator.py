@@ -0,0 +1,196 @@
+import numpy as np
+import random
+
+# Walls are stored as a uint8 bitmask per cell, one bit per side in action order
+# (up/top, down/bottom, left, right), so "is there a wall in the way of action a" is walls[r, c] >> a & 1
+TOP, BOTTOM, LEFT, RIGHT = 1, 2, 4, 8
+ALL_WALLS = TOP | BOTTOM | LEFT | RIGHT
+OPPOSITE = {TOP: BOTTOM, BOTTOM: TOP, LEFT: RIGHT, RIGHT: LEFT}
+
+
+def empty_walls(rows, cols, border=False):
+    walls = np.zeros((rows, cols), dtype=np.uint8)
+    if border:
+        walls[0, :] |= TOP
+        walls[-1, :] |= BOTTOM
+        walls[:, 0] |= LEFT
+        walls[:, -1] |= RIGHT
+    return walls
+
+
+def recursive_backtracker(rows, cols, seed=None):
+    # Iterative depth-first search (long, winding corridors). Runs on flat Python lists,
+    # which is several times faster than per-cell NumPy access for this strictly sequential walk.
+    rng = random.Random(seed)
+    n_cells = rows * cols
+    walls = [ALL_WALLS] * n_cells
+    visited = bytearray(n_cells)
+    # (offset, wall bit, bit of the neighbour on the other side)
+    moves = ((-cols, TOP, BOTTOM), (cols, BOTTOM, TOP), (-1, LEFT, RIGHT), (1, RIGHT, LEFT))
+    
+    cell = rng.randrange(n_cells)
+    visited[cell] = 1
+    stack = [cell]
+    while stack:
+        cell = stack[-1]
+        row, col = divmod(cell, cols)
+        options = []
+        if row > 0 and not visited[cell - cols]:
+            options.append(moves[0])
+        if row < rows - 1 and not visited[cell + cols]:
+            options.append(moves[1])
+        if col > 0 and not visited[cell - 1]:
+            options.append(moves[2])
+        if col < cols - 1 and not visited[cell + 1]:
+            options.append(moves[3])
+        if not options:
+            stack.pop()
+            continue
+        offset, bit, opposite = options[rng.randrange(len(options))] if len(options) > 1 else options[0]
+        neighbour = cell + offset
+        walls[cell] &= ~bit
+        walls[neighbour] &= ~opposite
+        visited[neighbour] = 1
+        stack.append(neighbour)
+    return np.array(walls, dtype=np.uint8).reshape(rows, cols)
+
+
+def kruskal(rows, cols, seed=None):
+    # Random-weight minimum spanning tree of the cell graph, i.e. exactly the maze Kruskal's algorithm
+    # builds from a shuffled edge list. The tree is found with Boruvka rounds instead of a union-find loop:
+    # every round is a handful of vectorized passes over the remaining edges and there are only
+    # O(log cells) rounds, which is what makes 2000x2000 mazes take seconds.
+    rng = np.random.default_rng(seed)
+    n_cells = rows * cols
+    cells = np.arange(n_cells).reshape(rows, cols)
+    u = np.concatenate([cells[:, :-1].ravel(), cells[:-1, :].ravel()])
+    v = np.concatenate([cells[:, 1:].ravel(), cells[1:, :].ravel()])
+    # Shuffling the edges makes the edge position its (unique) random weight
+    order = rng.permutation(len(u))
+    u, v = u[order], v[order]
+    weight = np.arange(len(u))
+    
+    labels = np.arange(n_cells)
+    tree = []
+    while len(u):
+        lu, lv = labels[u], labels[v]
+        external = lu != lv
+        u, v, weight, lu, lv = u[external], v[external], weight[external], lu[external], lv[external]
+        if not len(u):
+            break
+        
+        # Cheapest outgoing edge of every component
+        best = np.full(n_cells, len(order))
+        np.minimum.at(best, lu, weight)
+        np.minimum.at(best, lv, weight)
+        chosen = (best[lu] == weight) | (best[lv] == weight)
+        tree.append(np.stack([u[chosen], v[chosen]]))
+        
+        # Hook each component onto the component across its cheapest edge, cut the 2-cycles
+        # formed when both ends picked the same edge, then pointer-jump to the roots
+        parent = np.arange(n_cells)
+        from_u = best[lu] == weight
+        from_v = best[lv] == weight
+        parent[lu[from_u]] = lv[from_u]
+        parent[lv[from_v]] = lu[from_v]
+        mutual = (parent[parent] == np.arange(n_cells)) & (parent < np.arange(n_cells))
+        parent[mutual] = np.flatnonzero(mutual)
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+        labels = parent[labels]
+    
+    walls = np.full(n_cells, ALL_WALLS, dtype=np.uint8)
+    if tree:
+        a, b = np.concatenate(tree, axis=1)
+        _remove_walls(walls, a, b, cols)
+    return walls.reshape(rows, cols)
+
+
+def wilson(rows, cols, seed=None):
+    # Loop-erased random walks, giving a uniformly random spanning tree (no algorithmic bias).
+    # Early walks are long on big grids, so prefer kruskal() beyond a few hundred cells per side.
+    rng = random.Random(seed)
+    n_cells = rows * cols
+    walls = [ALL_WALLS] * n_cells
+    in_tree = bytearray(n_cells)
+    in_tree[rng.randrange(n_cells)] = 1
+    # Direction taken out of each cell during the current walk; revisits overwrite it, which erases loops
+    exit_move = [0] * n_cells
+    moves = ((-cols, TOP, BOTTOM), (cols, BOTTOM, TOP), (-1, LEFT, RIGHT), (1, RIGHT, LEFT))
+    
+    for start in range(n_cells):
+        if in_tree[start]:
+            continue
+        cell = start
+        while not in_tree[cell]:
+            row, col = divmod(cell, cols)
+            while True:
+                move = rng.randrange(4)
+                if (move == 0 and row > 0) or (move == 1 and row < rows - 1) or (move == 2 and col > 0) or (move == 3 and col < cols - 1):
+                    break
+            exit_move[cell] = move
+            cell += moves[move][0]
+        
+        cell = start
+        while not in_tree[cell]:
+            offset, bit, opposite = moves[exit_move[cell]]
+            walls[cell] &= ~bit
+            walls[cell + offset] &= ~opposite
+            in_tree[cell] = 1
+            cell += offset
+    return np.array(walls, dtype=np.uint8).reshape(rows, cols)
+
+
+def braid(walls, fraction=1.0, seed=None):
+    # Knock one wall out of a random `fraction` of the dead ends, adding loops (multiple routes)
+    rng = np.random.default_rng(seed)
+    walls = walls.copy()
+    rows, cols = walls.shape
+    flat = walls.ravel()
+    
+    open_sides = (ALL_WALLS & ~flat[:, None]) >> np.arange(4) & 1
+    dead_ends = np.flatnonzero(open_sides.sum(axis=1) == 1)
+    dead_ends = dead_ends[rng.random(len(dead_ends)) < fraction]
+    if not len(dead_ends):
+        return walls
+    
+    row, col = np.divmod(dead_ends, cols)
+    # Walled sides that lead to another cell (not the outer border)
+    candidates = np.stack([row > 0, row < rows - 1, col > 0, col < cols - 1], axis=1)
+    candidates &= (flat[dead_ends, None] >> np.arange(4) & 1).astype(bool)
+    keys = np.where(candidates, rng.random(candidates.shape), -1.0)
+    side = keys.argmax(axis=1)
+    valid = keys.max(axis=1) >= 0
+    dead_ends, side = dead_ends[valid], side[valid]
+    
+    neighbours = dead_ends + np.array([-cols, cols, -1, 1])[side]
+    _remove_walls(flat, dead_ends, neighbours, cols)
+    return walls
+
+
+def generate_maze(rows, cols, algorithm="kruskal", braid_fraction=0.0, seed=None):
+    generators = {
+        'backtracker': recursive_backtracker,
+        'kruskal': kruskal,
+        'wilson': wilson,
+    }
+    if algorithm not in generators:
+        raise ValueError(f"Unknown maze algorithm: {algorithm}")
+    walls = generators[algorithm](rows, cols, seed=seed)
+    if braid_fraction > 0:
+        walls = braid(walls, braid_fraction, seed=None if seed is None else seed + 1)
+    return walls
+
+
+def _remove_walls(flat_walls, a, b, cols):
+    # Open the shared side of each pair of adjacent flat cell indices (a[i], b[i]). Pairs are told apart by
+    # whether both cells are in the same row too: with one column a vertical step is also an offset of 1.
+    diff = b - a
+    horizontal = a // cols == b // cols
+    for offset, bit, same_row in ((-cols, TOP, False), (cols, BOTTOM, False), (-1, LEFT, True), (1, RIGHT, True)):
+        mask = (diff == offset) & (horizontal == same_row)
+        flat_walls[a[mask]] &= np.uint8(~bit & 0xFF)
+        flat_walls[b[mask]] &= np.uint8(~OPPOSITE[bit] & 0xFF)
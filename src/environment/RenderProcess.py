@@ -0,0 +1,60 @@
+import multiprocessing as mp
+import queue
+
+
+class RendererProcess:
+    # Draws the maze in its own process so training never waits on pygame.
+    # Training pushes (row, col, episode, new_episode) snapshots into a bounded queue; when the renderer
+    # falls behind the queue fills up and further snapshots are dropped instead of blocking the learner.
+    def __init__(self, walls, start_pos, goal_pos, enemy_pos=None, cell_size=80, queue_size=256):
+        self._queue = mp.Queue(maxsize=queue_size)
+        self._process = mp.Process(target=_render_loop, args=(walls, start_pos, goal_pos, enemy_pos, cell_size, self._queue),
+                                   daemon=True)
+        self._process.start()
+        self.dropped = 0
+    
+    def push(self, agent_pos, episode, new_episode=False):
+        try:
+            self._queue.put_nowait((int(agent_pos[0]), int(agent_pos[1]), episode, new_episode))
+        except queue.Full:
+            self.dropped += 1
+    
+    def close(self, timeout=5.0):
+        # Let the renderer drain what is queued, then stop it
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+
+
+def _render_loop(walls, start_pos, goal_pos, enemy_pos, cell_size, snapshots):
+    # Runs in the child process: pygame is only imported and initialised here
+    import pygame
+    from src.environment.Environment import myMazeEnv
+    
+    env = myMazeEnv(render_mode="human", walls=walls, cell_size=cell_size,
+                    start_pos=start_pos, goal_pos=goal_pos, enemy_pos=enemy_pos)
+    env.reset()
+    env.render()
+    episode_shown = None
+    while True:
+        try:
+            snapshot = snapshots.get(timeout=0.1)
+        except queue.Empty:
+            pygame.event.pump()
+            continue
+        if snapshot is None or any(event.type == pygame.QUIT for event in pygame.event.get(pygame.QUIT)):
+            break
+        
+        row, col, episode, new_episode = snapshot
+        if episode != episode_shown:
+            pygame.display.set_caption(f"Maze - episode {episode + 1}")
+            episode_shown = episode
+        # A new episode jumps to its start cell instead of sliding there from the last position
+        env.previous_pos = (row, col) if new_episode else env.agent_pos
+        env.agent_pos = (row, col)
+        env.render()
+    env.close()
@@ -0,0 +1,75 @@
+import numpy as np
+from src.environment.Environment import myMazeEnv
+
+
+class VectorMazeEnv:
+    # Steps N slots in lockstep with one NumPy gather per call.
+    # Each slot runs on one of the given myMazeEnv mazes (slot i uses envs[maze_ids[i]]);
+    # use from_single() for N agents sharing one maze. All mazes must have the same grid_size.
+    def __init__(self, envs, maze_ids=None, max_steps=None):
+        self.envs = list(envs)
+        self.grid_size = self.envs[0].grid_size
+        if any(env.grid_size != self.grid_size for env in self.envs):
+            raise ValueError("All mazes in a VectorMazeEnv must share the same grid_size")
+        if any(env.start_pos == (-1, -1) for env in self.envs):
+            raise ValueError("Every maze needs a start position before it can be vectorized")
+        
+        self.num_envs = len(self.envs) if maze_ids is None else len(maze_ids)
+        self.maze_ids = np.arange(self.num_envs) if maze_ids is None else np.asarray(maze_ids, dtype=np.int64)
+        self.action_size = self.envs[0].action_space.n
+        self.max_steps = max_steps
+        self.refresh_tables()
+        
+        self.states = self.start_states.copy()
+        self.step_counts = np.zeros(self.num_envs, dtype=np.int64)
+    
+    @classmethod
+    def from_single(cls, env, num_agents, max_steps=None):
+        return cls([env], maze_ids=np.zeros(num_agents, dtype=np.int64), max_steps=max_steps)
+    
+    @classmethod
+    def from_config(cls, num_envs, max_steps=None, **env_kwargs):
+        # N independent random mazes built with the same myMazeEnv arguments
+        return cls([myMazeEnv(**env_kwargs) for _ in range(num_envs)], max_steps=max_steps)
+    
+    def refresh_tables(self):
+        # Stack the per-maze tables as (M, S, A) / (M, S); call again after editing a maze
+        n_states = self.grid_size[0] * self.grid_size[1]
+        self.next_state = np.stack([env.next_state.reshape(n_states, self.action_size) for env in self.envs])
+        self.reward = np.stack([env.reward_table.ravel() for env in self.envs])
+        self.terminal = np.stack([env.terminal.ravel() for env in self.envs])
+        self.start_states = np.array([self.envs[m].state_index(self.envs[m].start_pos) for m in self.maze_ids], dtype=np.int64)
+    
+    def reset(self):
+        self.states = self.start_states.copy()
+        self.step_counts[:] = 0
+        return self.positions(self.states)
+    
+    def step(self, actions):
+        next_states, rewards, dones, truncated = self.step_indices(actions)
+        return self.positions(next_states), rewards, dones, truncated, {}
+    
+    def step_indices(self, actions):
+        # Returns the real successors (before auto-reset), so they can be fed straight into a Q update;
+        # self.states already holds the start cells of the slots that finished
+        next_states = self.next_state[self.maze_ids, self.states, actions]
+        rewards = self.reward[self.maze_ids, next_states]
+        dones = self.terminal[self.maze_ids, next_states]
+        
+        self.step_counts += 1
+        if self.max_steps is None:
+            truncated = np.zeros(self.num_envs, dtype=bool)
+        else:
+            truncated = ~dones & (self.step_counts >= self.max_steps)
+        
+        finished = dones | truncated
+        self.states = np.where(finished, self.start_states, next_states)
+        self.step_counts[finished] = 0
+        return next_states, rewards, dones, truncated
+    
+    def positions(self, states):
+        return np.stack(np.divmod(states, self.grid_size[1]), axis=1)
+    
+    def close(self):
+        for env in self.envs:
+            env.close()
@@ -1,11 +1,50 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
-import threading
+import multiprocessing as mp
+from queue import Empty
 from src.training.train import train
-from src.utils.visualize import visualize_q_table, plot_learning_curve
+from src.utils.visualize import visualize_q_table, plot_learning_curve, LiveLearningCurve
+from src.utils.metrics_store import MetricsStore
 import time
+import os
 from datetime import timedelta
 
+POLL_INTERVAL_MS = 100  # GUI applies training updates at 10 Hz, however fast the episodes come
+FLUSH_INTERVAL = 0.05  # seconds the training process batches episodes before sending them
+MAX_LOG_LINES = 2000  # the progress log is a ring, older lines are trimmed
+METRICS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           "output", "train_info", "gui_metrics")
+
+
+def _training_process(params, messages, stop_event):
+    # Runs train() in its own process so it never competes with the Tk mainloop for the GIL.
+    # Episodes are sent in batches: ("episodes", [(episode, reward, steps, success, success_rate, episode_time), ...]),
+    # then ("done", q_table) or ("error", message).
+    batch = []
+    last_flush = time.time()
+    successes = 0
+    
+    def update_callback(episode, reward, steps, success_rate, episode_time=None, phases=None):
+        nonlocal last_flush, successes
+        # The callback only gets the cumulative rate, the episode's own outcome is the change in the count
+        count = round(success_rate * (episode + 1))
+        batch.append((episode, reward, steps, count > successes, success_rate, episode_time))
+        successes = count
+        now = time.time()
+        if now - last_flush >= FLUSH_INTERVAL:
+            messages.put(("episodes", batch[:]))
+            batch.clear()
+            last_flush = now
+        return not stop_event.is_set()
+    
+    try:
+        agent = train(**params, callback=update_callback)
+        if batch:
+            messages.put(("episodes", batch))
+        messages.put(("done", agent.q_table))
+    except Exception as e:
+        messages.put(("error", str(e)))
+
 class MazeTrainingGUI:
     def __init__(self, root):
         self.root = root
@@ -35,10 +74,9 @@ class MazeTrainingGUI:
         self.exploration_decay = tk.StringVar(value="0.995")
         self.load_previous = tk.BooleanVar(value=False)
         
-        # Training metrics
-        self.rewards_history = []
-        self.steps_history = []
-        self.success_rate = []
+        # Training metrics, spilled to disk so a long run doesn't grow the GUI's memory
+        self.metrics = None
+        self.live_curve = None
         self.current_q_table = None
         self.start_time = None
         
@@ -48,8 +86,10 @@ class MazeTrainingGUI:
         # Create progress widgets
         self.create_progress_widgets()
         
-        # Training thread
-        self.training_thread = None
+        # Training process and the queue it reports on
+        self.training_process = None
+        self.messages = None
+        self.stop_event = None
         self.is_training = False
         
     def create_config_widgets(self):
@@ -102,6 +142,8 @@ class MazeTrainingGUI:
         
         ttk.Button(self.visualize_frame, text="Show Q-table", command=self.show_q_table).grid(row=0, column=0, padx=5, pady=2)
         ttk.Button(self.visualize_frame, text="Show Learning Curves", command=self.show_learning_curves).grid(row=0, column=1, padx=5, pady=2)
+        ttk.Button(self.visualize_frame, text="Show Policy", command=self.show_policy).grid(row=1, column=0, padx=5, pady=2)
+        ttk.Button(self.visualize_frame, text="Live Learning Curves", command=self.show_live_curves).grid(row=1, column=1, padx=5, pady=2)
         
     def create_progress_widgets(self):
         # Progress frame
@@ -138,6 +180,10 @@ class MazeTrainingGUI:
         
     def log_progress(self, message):
         self.progress_text.insert(tk.END, message + "\n")
+        # Trim the oldest lines so the widget never grows with run length
+        excess = int(self.progress_text.index('end-1c').split('.')[0]) - 1 - MAX_LOG_LINES
+        if excess > 0:
+            self.progress_text.delete(1.0, f"{excess + 1}.0")
         self.progress_text.see(tk.END)
         
     def show_q_table(self):
@@ -148,14 +194,47 @@ class MazeTrainingGUI:
         else:
             self.log_progress("No Q-table available. Please train the agent first.")
             
+    def show_policy(self):
+        if self.current_q_table is not None:
+            grid_size = (int(self.grid_size.get()), int(self.grid_size.get()))
+            visualize_q_table(self.current_q_table, grid_size, view="policy")
+            self.log_progress("Policy visualization generated and saved in 'output/visualizations/q_table_visualization.png'")
+        else:
+            self.log_progress("No Q-table available. Please train the agent first.")
+    
+    def show_live_curves(self):
+        # Embedded figure whose lines are updated in place on every poll while training runs
+        if self.live_curve is not None:
+            return
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        window = tk.Toplevel(self.root)
+        window.title("Live Learning Curves")
+        self.live_curve = LiveLearningCurve()
+        FigureCanvasTkAgg(self.live_curve.fig, master=window).get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        def on_close():
+            self.live_curve = None
+            window.destroy()
+        window.protocol("WM_DELETE_WINDOW", on_close)
+        
+        # Catch up with the episodes already trained
+        if self.metrics is not None and len(self.metrics):
+            for reward, steps, success_rate in zip(self.metrics.column('reward').tolist(), self.metrics.column('steps').tolist(),
+                                                   self.metrics.cumulative_success_rate().tolist()):
+                self.live_curve.add(reward, steps, success_rate)
+        self.live_curve.refresh()
+    
     def show_learning_curves(self):
-        if self.rewards_history:
-            plot_learning_curve(self.rewards_history, self.steps_history, self.success_rate)
+        if self.metrics is not None and len(self.metrics):
+            plot_learning_curve(self.metrics.column('reward'), self.metrics.column('steps'),
+                                self.metrics.cumulative_success_rate())
             self.log_progress("Learning curves generated and saved in 'output/visualizations/learning_curves.png'")
         else:
             self.log_progress("No training data available. Please train the agent first.")
         
     def toggle_training(self):
+        if self.training_process is not None and not self.is_training:
+            return  # the stopped run is still shutting down
         if not self.is_training:
             self.start_training()
         else:
@@ -168,9 +247,9 @@ class MazeTrainingGUI:
         self.update_progress(0)
         
         # Reset training metrics
-        self.rewards_history = []
-        self.steps_history = []
-        self.success_rate = []
+        if self.metrics is not None:
+            self.metrics.close()
+        self.metrics = MetricsStore(METRICS_DIR)
         self.current_q_table = None
         self.start_time = time.time()
         
@@ -180,59 +259,82 @@ class MazeTrainingGUI:
             'grid_size': (int(self.grid_size.get()), int(self.grid_size.get())),
             'number_of_walls': int(self.num_walls.get()),
             'max_steps_per_episode': int(self.max_steps.get()),
-            'load_previous': self.load_previous.get()
+            'load_previous': self.load_previous.get(),
+            'learning_rate': float(self.learning_rate.get()),
+            'discount_factor': float(self.discount_factor.get()),
+            'exploration_rate': float(self.exploration_rate.get()),
+            'exploration_decay': float(self.exploration_decay.get())
         }
         
-        # Start training in a separate thread
-        self.training_thread = threading.Thread(target=self.run_training, args=(params,))
-        self.training_thread.start()
+        # Start training in a separate process (spawned, since forking a process that owns a Tk window is unsafe)
+        ctx = mp.get_context("spawn")
+        self.messages = ctx.Queue()
+        self.stop_event = ctx.Event()
+        self.training_process = ctx.Process(target=_training_process, args=(params, self.messages, self.stop_event), daemon=True)
+        self.training_process.start()
+        self.root.after(POLL_INTERVAL_MS, self.poll_training, params)
         
     def stop_training(self):
         self.is_training = False
+        if self.stop_event is not None:
+            self.stop_event.set()
         self.start_button.config(text="Start Training")
         
-    def run_training(self, params):
+    def poll_training(self, params):
+        # Drain everything the training process sent since the last poll and apply it as one update
+        episodes = []
+        finished = False
         try:
-            # Custom callback function to update GUI
-            def update_callback(episode, reward, steps, success_rate, episode_time=None):
-                if not self.is_training:
-                    return False
-                    
-                # Update progress slider and label
-                progress = (episode + 1) / params['episodes'] * 100
-                self.root.after(0, lambda: self.update_progress(progress))
-                
-                # Update training metrics
-                self.rewards_history.append(reward)
-                self.steps_history.append(steps)
-                self.success_rate.append(success_rate)
-                
-                # Calculate total elapsed time
-                total_elapsed_time = time.time() - self.start_time
-                elapsed_time_str = str(timedelta(seconds=int(total_elapsed_time)))
-                
-                # Log progress
-                message = f"Episode {episode + 1}/{params['episodes']}\n"
-                message += f"Reward: {reward:.2f}\n"
-                message += f"Steps: {steps}\n"
-                message += f"Success Rate: {success_rate:.2%}\n"
-                if episode_time is not None:
-                    message += f"Episode Time: {episode_time:.2f} seconds\n"
-                message += f"Total Time Elapsed: {elapsed_time_str}\n"
-                message += "-" * 50
-                self.root.after(0, lambda: self.log_progress(message))
-                
-                return True
-            
-            # Start training
-            agent = train(**params, callback=update_callback)
-            self.current_q_table = agent.q_table
-            
-        except Exception as e:
-            self.root.after(0, lambda: self.log_progress(f"Error: {str(e)}"))
-        finally:
-            self.root.after(0, lambda: self.start_button.config(text="Start Training"))
+            while True:
+                kind, payload = self.messages.get_nowait()
+                if kind == "episodes":
+                    episodes.extend(payload)
+                elif kind == "done":
+                    self.current_q_table = payload
+                    finished = True
+                else:
+                    self.log_progress(f"Error: {payload}")
+                    finished = True
+        except Empty:
+            pass
+        
+        if episodes:
+            self.apply_episodes(episodes, params)
+        if not finished and not self.training_process.is_alive():
+            # Exited without reporting back (e.g. killed), nothing more will arrive
+            finished = self.messages.empty()
+        
+        if finished:
+            self.training_process.join()
+            self.training_process = None
             self.is_training = False
+            self.start_button.config(text="Start Training")
+        else:
+            self.root.after(POLL_INTERVAL_MS, self.poll_training, params)
+    
+    def apply_episodes(self, episodes, params):
+        for _, reward, steps, success, success_rate, episode_time in episodes:
+            self.metrics.append(reward, steps, success, episode_time or 0.0)
+            if self.live_curve is not None:
+                self.live_curve.add(reward, steps, success_rate)
+        if self.live_curve is not None:
+            self.live_curve.refresh()
+        
+        # Only the latest episode is shown, with a count of the ones folded into this update
+        episode, reward, steps, _, success_rate, episode_time = episodes[-1]
+        self.update_progress((episode + 1) / params['episodes'] * 100)
+        elapsed_time_str = str(timedelta(seconds=int(time.time() - self.start_time)))
+        message = f"Episode {episode + 1}/{params['episodes']}"
+        if len(episodes) > 1:
+            message += f" (+{len(episodes) - 1} more since last update)"
+        message += f"\nReward: {reward:.2f}\n"
+        message += f"Steps: {steps}\n"
+        message += f"Success Rate: {success_rate:.2%} (last {self.metrics.window}: {self.metrics.moving_average('success'):.2%})\n"
+        if episode_time is not None:
+            message += f"Episode Time: {episode_time:.2f} seconds\n"
+        message += f"Total Time Elapsed: {elapsed_time_str}\n"
+        message += "-" * 50
+        self.log_progress(message)
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,164 @@
+import numpy as np
+from src.utils.metrics_store import METRICS_COLUMNS
+import random
+import shutil
+import json
+import os
+
+# Transition arrays of a ReplayBuffer that go into a checkpoint
+REPLAY_COLUMNS = ('states', 'actions', 'rewards', 'next_states', 'dones')
+
+# A checkpoint is a directory of plain .npy arrays (no pickling, so the Q-table can be memory-mapped)
+# plus a state.json. It is written under a temporary name and renamed into place, then the `latest`
+# pointer file is replaced atomically, so a crash mid-write never leaves a half-written checkpoint visible.
+
+
+def save_checkpoint(checkpoint_dir, agent, env, episodes_done, successful_episodes, total_steps, metrics, keep=3):
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    name = f"ckpt-{episodes_done:08d}"
+    final_path = os.path.join(checkpoint_dir, name)
+    tmp_path = final_path + ".tmp"
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+    
+    np.save(os.path.join(tmp_path, "q_table.npy"), np.asarray(agent.q_table_as_array(), dtype=float))
+    np.save(os.path.join(tmp_path, "walls.npy"), env.walls)
+    for column in METRICS_COLUMNS:
+        np.save(os.path.join(tmp_path, f"metrics_{column}.npy"), metrics.column(column))
+    
+    py_version, py_state, py_gauss = random.getstate()
+    np_kind, np_keys, np_pos, np_has_gauss, np_cached = np.random.get_state()
+    state = {
+        'episodes_done': episodes_done,
+        'successful_episodes': successful_episodes,
+        'total_steps': total_steps,
+        'exploration_rate': agent.exploration_rate,
+        'q_table_backend': agent.q_table_backend,
+        'start_pos': list(env.start_pos),
+        'goal_pos': None if env.goal_pos is None else list(env.goal_pos),
+        'enemy_pos': None if env.enemy_pos is None else list(env.enemy_pos),
+        'python_random': [py_version, list(py_state), py_gauss],
+        'numpy_random': [np_kind, np_keys.tolist(), int(np_pos), int(np_has_gauss), float(np_cached)],
+    }
+    if agent.planning_steps:
+        # Dyna-Q model and the prioritized sweeping queue; predecessors are rebuilt from the model on load
+        np.save(os.path.join(tmp_path, "model_next.npy"), agent._model_next)
+        np.save(os.path.join(tmp_path, "model_reward.npy"), agent._model_reward)
+        np.save(os.path.join(tmp_path, "model_done.npy"), agent._model_done)
+        np.save(os.path.join(tmp_path, "model_observed.npy"), agent._observed[:agent._n_observed])
+        np.save(os.path.join(tmp_path, "model_queue_priority.npy"), np.array([entry[0] for entry in agent._queue], dtype=float))
+        np.save(os.path.join(tmp_path, "model_queue_pair.npy"), np.array([entry[1] for entry in agent._queue], dtype=np.int64))
+        state['planning_model'] = True
+    if agent.replay is not None:
+        # Replay buffer: the filled part of the ring, its write position and the sampler state
+        replay = agent.replay
+        for column in REPLAY_COLUMNS:
+            np.save(os.path.join(tmp_path, f"replay_{column}.npy"), getattr(replay, column)[:replay.size])
+        state['replay'] = {'position': replay.position, 'size': replay.size, 'countdown': agent._replay_countdown}
+        if replay.mode == "prioritized":
+            np.save(os.path.join(tmp_path, "replay_tree.npy"), replay._tree.tree)
+            state['replay'].update(max_priority=replay._max_priority, new=list(replay._new))
+    with open(os.path.join(tmp_path, "state.json"), 'w') as f:
+        json.dump(state, f)
+    
+    # Rewriting the checkpoint `latest` points to: move the old one aside and delete it only after the
+    # pointer is updated, so `latest` always names a complete directory
+    old_path = None
+    if os.path.exists(final_path):
+        old_path = final_path + ".old"
+        if os.path.exists(old_path):
+            shutil.rmtree(old_path)
+        os.replace(final_path, old_path)
+    os.replace(tmp_path, final_path)
+    _write_atomic(os.path.join(checkpoint_dir, "latest"), name)
+    if old_path is not None:
+        shutil.rmtree(old_path, ignore_errors=True)
+    
+    # Drop the oldest checkpoints, never the one `latest` points to
+    checkpoints = sorted(entry for entry in os.listdir(checkpoint_dir)
+                         if entry.startswith("ckpt-") and not entry.endswith((".tmp", ".old")))
+    for old in checkpoints[:-keep] if keep else []:
+        if old != name:
+            shutil.rmtree(os.path.join(checkpoint_dir, old), ignore_errors=True)
+    return final_path
+
+
+def load_checkpoint(checkpoint_dir, mmap=True):
+    # Returns None when there is nothing to resume. With mmap the Q-table is mapped copy-on-write:
+    # opening is near-instant whatever its size, and updates go to private pages, never back to the file.
+    pointer = os.path.join(checkpoint_dir, "latest")
+    if not os.path.exists(pointer):
+        return None
+    with open(pointer) as f:
+        path = os.path.join(checkpoint_dir, f.read().strip())
+    with open(os.path.join(path, "state.json")) as f:
+        state = json.load(f)
+    
+    state['q_table'] = np.load(os.path.join(path, "q_table.npy"), mmap_mode='c' if mmap else None)
+    state['walls'] = np.load(os.path.join(path, "walls.npy"))
+    state['metrics'] = {column: np.load(os.path.join(path, f"metrics_{column}.npy")) for column in METRICS_COLUMNS}
+    if state.get('planning_model'):
+        state['model'] = {key: np.load(os.path.join(path, f"model_{key}.npy"))
+                          for key in ('next', 'reward', 'done', 'observed', 'queue_priority', 'queue_pair')}
+    if 'replay' in state:
+        state['replay_arrays'] = {column: np.load(os.path.join(path, f"replay_{column}.npy")) for column in REPLAY_COLUMNS}
+        if os.path.exists(os.path.join(path, "replay_tree.npy")):
+            state['replay_arrays']['tree'] = np.load(os.path.join(path, "replay_tree.npy"))
+    for key in ('start_pos', 'goal_pos', 'enemy_pos'):
+        if state[key] is not None:
+            state[key] = tuple(state[key])
+    state['path'] = path
+    return state
+
+
+def restore_planning_model(agent, state):
+    # Puts a checkpointed Dyna-Q model back into an agent built with the same grid and planning settings
+    model = state.get('model')
+    if model is None or not agent.planning_steps:
+        return
+    agent._model_next[:] = model['next']
+    agent._model_reward[:] = model['reward']
+    agent._model_done[:] = model['done']
+    agent._n_observed = len(model['observed'])
+    agent._observed[:agent._n_observed] = model['observed']
+    # The saved list already satisfies the heap invariant, so it is restored as is
+    agent._queue = list(zip(model['queue_priority'].tolist(), model['queue_pair'].tolist()))
+    agent._predecessors = {}
+    for pair in model['observed'].tolist():
+        s, a = divmod(pair, agent.action_size)
+        agent._predecessors.setdefault(int(agent._model_next[s, a]), set()).add(pair)
+
+
+def restore_replay_buffer(agent, state):
+    # Refills the replay buffer of an agent built with the same replay settings
+    if 'replay' not in state or agent.replay is None:
+        return
+    replay = agent.replay
+    arrays = state['replay_arrays']
+    size = state['replay']['size']
+    for column in REPLAY_COLUMNS:
+        getattr(replay, column)[:size] = arrays[column]
+    replay.position = state['replay']['position']
+    replay.size = size
+    agent._replay_countdown = state['replay']['countdown']
+    if replay.mode == "prioritized" and 'tree' in arrays:
+        replay._tree.tree[:] = arrays['tree']
+        replay._max_priority = state['replay']['max_priority']
+        replay._new = list(state['replay']['new'])
+
+
+def restore_random_state(state):
+    py_version, py_state, py_gauss = state['python_random']
+    random.setstate((py_version, tuple(py_state), py_gauss))
+    np_kind, np_keys, np_pos, np_has_gauss, np_cached = state['numpy_random']
+    np.random.set_state((np_kind, np.array(np_keys, dtype=np.uint32), np_pos, np_has_gauss, np_cached))
+
+
+def _write_atomic(path, text):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
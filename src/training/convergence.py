@@ -0,0 +1,77 @@
+import numpy as np
+from collections import deque
+from src.agents.solver import bfs_distances, greedy_path_length
+
+
+class ConvergenceMonitor:
+    # Early-stopping criteria, each one enabled by its argument and checked every `check_every` episodes:
+    #   q_delta_tol       largest |change| of any Q-value since the previous check stays below the tolerance
+    #   policy_stable     greedy action of every cell unchanged since the previous check
+    #   success_tol       moving-average success rate (over success_window episodes) moves less than the
+    #                     tolerance across the last `plateau_checks` checks (default: patience)
+    #   match_shortest_path  greedy path from the start is as short as the BFS shortest path
+    # Training stops as soon as one criterion has held for `patience` consecutive checks. The success plateau
+    # already spans its checks, so it stops the first time that span is flat, after success_window +
+    # plateau_checks * check_every episodes at the earliest.
+    def __init__(self, patience=50, q_delta_tol=None, policy_stable=False, success_tol=None, success_window=100,
+                 match_shortest_path=False, check_every=1, plateau_checks=None):
+        self.patience = patience
+        self.q_delta_tol = q_delta_tol
+        self.policy_stable = policy_stable
+        self.success_tol = success_tol
+        self.success_window = success_window
+        self.match_shortest_path = match_shortest_path
+        self.check_every = check_every
+        
+        self.streaks = {'q_delta': 0, 'policy': 0, 'success_plateau': 0, 'shortest_path': 0}
+        self.stop_reason = None
+        self._previous_q = None
+        self._previous_policy = None
+        self._shortest = None
+        # O(1) moving average over the last success_window episodes
+        self._outcomes = deque(maxlen=success_window)
+        self._successes = 0
+        self._averages = deque(maxlen=(patience if plateau_checks is None else plateau_checks) + 1)
+    
+    def update(self, episode, agent, env, success):
+        # Call once per finished episode; returns the stop reason, or None to keep training
+        if len(self._outcomes) == self.success_window:
+            self._successes -= self._outcomes[0]
+        self._outcomes.append(int(success))
+        self._successes += int(success)
+        if (episode + 1) % self.check_every:
+            return None
+        
+        needs_q = self.q_delta_tol is not None or self.policy_stable
+        q_table = np.array(agent.q_table_as_array(), dtype=float) if needs_q else None
+        
+        if self.q_delta_tol is not None:
+            converged = self._previous_q is not None and np.abs(q_table - self._previous_q).max() < self.q_delta_tol
+            self._track('q_delta', converged, f"max Q-value change below {self.q_delta_tol}")
+            self._previous_q = q_table
+        
+        if self.policy_stable:
+            policy = q_table.argmax(axis=-1)
+            stable = self._previous_policy is not None and np.array_equal(policy, self._previous_policy)
+            self._track('policy', stable, "greedy policy unchanged")
+            self._previous_policy = policy
+        
+        if self.success_tol is not None and len(self._outcomes) == self.success_window:
+            self._averages.append(self._successes / self.success_window)
+            plateau = len(self._averages) == self._averages.maxlen and max(self._averages) - min(self._averages) < self.success_tol
+            self._track('success_plateau', plateau,
+                        f"success rate plateaued at {self._averages[-1]:.2%} (window {self.success_window})", patience=1)
+        
+        if self.match_shortest_path:
+            if self._shortest is None:
+                self._shortest = int(bfs_distances(env)[env.start_pos])
+            length = greedy_path_length(env, agent.q_table)
+            self._track('shortest_path', self._shortest > 0 and length == self._shortest,
+                        f"greedy path matches the shortest path ({self._shortest} steps)")
+        
+        return self.stop_reason
+    
+    def _track(self, name, holds, reason, patience=None):
+        self.streaks[name] = self.streaks[name] + 1 if holds else 0
+        if self.stop_reason is None and self.streaks[name] >= (self.patience if patience is None else patience):
+            self.stop_reason = reason
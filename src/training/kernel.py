@@ -0,0 +1,131 @@
+import numpy as np
+from src.environment.Environment import myMazeEnv
+from src.environment.MazeGenerator import generate_maze
+from src.agents.agent import QLearningAgent
+import random
+import time
+import os
+
+
+def compile_tables(env):
+    # Plain-list copies of the env's transition tables: next_state[s][a], reward[s], terminal[s]
+    return env.next_state.reshape(-1, 4).tolist(), env.reward_table.ravel().tolist(), env.terminal.ravel().tolist()
+
+
+def run_episodes(next_state, reward, terminal, q, start, episodes, max_steps, learning_rate, discount_factor,
+                 exploration_rate, exploration_decay, rng):
+    # Fused Q-learning episode loop on flat state indices. q is a list of per-state lists of 4 floats and is
+    # updated in place; only per-episode aggregates come back: (rewards, steps, successes, final exploration rate).
+    # Per step it does one random draw, list lookups and C builtins (max / index), and allocates nothing.
+    rand = rng.random
+    rewards, steps_taken, successes = [], [], []
+    epsilon = exploration_rate
+    for _ in range(episodes):
+        state = start
+        total_reward = 0.0
+        success = done = False
+        for steps in range(1, max_steps + 1):
+            row = q[state]
+            u = rand()
+            if u < epsilon:
+                # u is uniform on [0, epsilon) here, so it doubles as the random action draw
+                action = int(u / epsilon * 4)
+            else:
+                action = row.index(max(row))  # first maximum, same as argmax
+            new_state = next_state[state][action]
+            r = reward[new_state]
+            total_reward += r
+            if terminal[new_state]:
+                row[action] += learning_rate * (r - row[action])
+                success = r == 1.0
+                done = True
+                break
+            row[action] += learning_rate * (r + discount_factor * max(q[new_state]) - row[action])
+            state = new_state
+        rewards.append(total_reward)
+        steps_taken.append(steps)
+        successes.append(success)
+        if done:  # like QLearningAgent.update, episodes cut off at max_steps don't decay exploration
+            epsilon *= exploration_decay
+    return rewards, steps_taken, successes, epsilon
+
+
+def train_fast(episodes=1000, grid_size=(6,6), number_of_walls=10, max_steps_per_episode=100, start_pos=(0, 0),
+               goal_pos=None, enemy_pos=None, maze_algorithm=None, braid_fraction=0.0, load_previous=False, callback=None,
+               learning_rate=0.1, discount_factor=0.95, exploration_rate=1.0, exploration_decay=0.995, seed=None,
+               callback_every=100, output_dir=None):
+    # Headless single-learner Q-learning through run_episodes. Same algorithm and schedule as train(),
+    # without logging, rendering, planning or checkpoints. The callback runs after every block of
+    # callback_every episodes, once per episode, and returning False stops at the end of that block.
+    rng = random.Random(seed)
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    goal_pos = (grid_size[0] - 1, grid_size[1] - 1) if goal_pos is None else goal_pos
+    walls = None
+    if maze_algorithm is not None:
+        walls = generate_maze(grid_size[0], grid_size[1], algorithm=maze_algorithm, braid_fraction=braid_fraction, seed=seed)
+    env = myMazeEnv(grid_size=grid_size, number_of_walls=number_of_walls, start_pos=start_pos, goal_pos=goal_pos,
+                    enemy_pos=enemy_pos, walls=walls)
+    agent = QLearningAgent(env.observation_space.shape[0], env.action_space.n, learning_rate=learning_rate,
+                           discount_factor=discount_factor, exploration_rate=exploration_rate,
+                           exploration_decay=exploration_decay, q_table_backend="array", grid_size=env.grid_size)
+
+    # output_dir keeps other runs (e.g. benchmarks) from overwriting the stored model
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        q_table_path = os.path.join(output_dir, "q_table.npy")
+    else:
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        q_table_path = os.path.join(project_root, "output", "models", "q_table.npy")
+    if load_previous and os.path.exists(q_table_path):
+        agent.load_q_table(q_table_path)
+
+    next_state, reward, terminal = compile_tables(env)
+    q = agent.q_table.reshape(-1, env.action_space.n).tolist()
+    start = env.state_index(env.start_pos)
+
+    rewards_history = []
+    steps_history = []
+    success_rate = []
+    successful_episodes = 0
+
+    start_time = time.time()
+    while len(rewards_history) < episodes:
+        block = min(callback_every, episodes - len(rewards_history)) if callback is not None else episodes
+        block_start = time.time()
+        rewards, steps_taken, successes, agent.exploration_rate = run_episodes(
+            next_state, reward, terminal, q, start, block, max_steps_per_episode, learning_rate, discount_factor,
+            agent.exploration_rate, exploration_decay, rng)
+        # The fused loop keeps no per-episode clock, so every episode of a block reports the block's average
+        episode_time = (time.time() - block_start) / block
+
+        keep_going = True
+        for total_reward, steps, success in zip(rewards, steps_taken, successes):
+            successful_episodes += success
+            rewards_history.append(total_reward)
+            steps_history.append(steps)
+            success_rate.append(successful_episodes / len(rewards_history))
+            if callback is not None and keep_going:
+                keep_going = callback(len(rewards_history) - 1, total_reward, steps, success_rate[-1], episode_time)
+        if not keep_going:
+            break
+
+    total_time = time.time() - start_time
+    total_steps = int(np.sum(steps_history))
+    steps_per_second = total_steps / total_time if total_time > 0 else float("inf")
+    agent.q_table = np.array(q).reshape(agent.q_table.shape)
+    final_success = success_rate[-1] if success_rate else 0.0
+    print(f"\nFast-kernel training complete!\nEpisodes: {len(rewards_history)}\nFinal success rate: {final_success:.2%}\nSteps per second: {steps_per_second:.1f}")
+
+    agent.save_q_table(q_table_path)
+    env.close()
+    return agent, {
+        'episodes': len(rewards_history),
+        'rewards_history': rewards_history,
+        'steps_history': steps_history,
+        'success_rate': success_rate,
+        'total_steps': total_steps,
+        'total_time': total_time,
+        'steps_per_second': steps_per_second,
+    }
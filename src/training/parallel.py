@@ -0,0 +1,216 @@
+import numpy as np
+import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
+from queue import Empty
+from src.environment.Environment import myMazeEnv
+from src.environment.MazeGenerator import generate_maze
+from src.agents.agent import QLearningAgent
+import random
+import time
+import os
+
+LOCK_MODES = ("hogwild", "striped")
+
+
+def _split_episodes(episodes, num_workers):
+    return [episodes // num_workers + (worker_id < episodes % num_workers) for worker_id in range(num_workers)]
+
+
+def _actor(worker_id, num_workers, shm_name, env_kwargs, episodes, params, locks, stop_event, results):
+    # One actor process: its own env and RNG, Q-learning backups straight into the shared table.
+    # Everything in the step loop is a Python list or a float memoryview over the shared buffer,
+    # so a step allocates no NumPy objects.
+    shm = SharedMemory(name=shm_name)
+    q = shm.buf.cast('d')
+    env = myMazeEnv(**env_kwargs)
+    next_state = env.next_state.ravel().tolist()
+    reward_of = env.reward_table.ravel().tolist()
+    terminal = env.terminal.ravel().tolist()
+
+    seed = params['seed']
+    rng = random.Random(None if seed is None else seed + worker_id)
+    if params['random_starts']:
+        start_cells = [s for s in range(len(terminal)) if not terminal[s] and next_state[4 * s:4 * s + 4] != [s] * 4]
+    start = env.state_index(env.start_pos)
+    learning_rate = params['learning_rate']
+    discount_factor = params['discount_factor']
+    max_steps = params['max_steps_per_episode']
+    report_every = params['report_every']
+    num_locks = len(locks) if locks else 0
+
+    # Like a single learner, exploration decays only after terminal episodes, never after ones cut off at
+    # max_steps. Each of this actor's terminal episodes stands for about num_workers of them across all
+    # actors, so it decays num_workers times; with one worker the schedule is exactly train()'s.
+    epsilon = params['exploration_rate']
+    decay = params['exploration_decay'] ** num_workers
+    rewards, steps_taken, successes, episode_times = [], [], [], []
+    terminated = 0
+    try:
+        for _ in range(episodes):
+            if stop_event.is_set():
+                break
+            episode_start = time.perf_counter()
+            state = rng.choice(start_cells) if params['random_starts'] else start
+            total_reward = 0.0
+            success = done = False
+            for step in range(1, max_steps + 1):
+                base = 4 * state
+                if rng.random() < epsilon:
+                    action = rng.randrange(4)
+                else:
+                    # First maximum wins, same tie-breaking as argmax in QLearningAgent
+                    action, best = 0, q[base]
+                    for a in (1, 2, 3):
+                        if q[base + a] > best:
+                            action, best = a, q[base + a]
+                new_state = next_state[base + action]
+                reward = reward_of[new_state]
+                done = terminal[new_state]
+                if done:
+                    target = reward
+                else:
+                    nb = 4 * new_state
+                    target = reward + discount_factor * max(q[nb], q[nb + 1], q[nb + 2], q[nb + 3])
+                index = base + action
+                if num_locks:
+                    with locks[state % num_locks]:
+                        q[index] += learning_rate * (target - q[index])
+                else:
+                    q[index] += learning_rate * (target - q[index])
+                total_reward += reward
+                state = new_state
+                if done:
+                    success = reward == 1.0
+                    break
+            if done:
+                epsilon *= decay
+                terminated += 1
+            rewards.append(total_reward)
+            steps_taken.append(step)
+            successes.append(success)
+            episode_times.append(time.perf_counter() - episode_start)
+            if len(rewards) >= report_every:
+                results.put((worker_id, rewards, steps_taken, successes, episode_times, terminated))
+                rewards, steps_taken, successes, episode_times = [], [], [], []
+                terminated = 0
+        if rewards:
+            results.put((worker_id, rewards, steps_taken, successes, episode_times, terminated))
+    finally:
+        results.put((worker_id, None, None, None, None, 0))
+        q.release()
+        shm.close()
+
+
+def train_parallel(episodes=1000, grid_size=(6,6), number_of_walls=10, max_steps_per_episode=100, num_workers=None,
+                   lock_mode="hogwild", num_locks=64, random_starts=False, start_pos=(0, 0), goal_pos=None, enemy_pos=None,
+                   maze_algorithm=None, braid_fraction=0.0, load_previous=False, callback=None, learning_rate=0.1,
+                   discount_factor=0.95, exploration_rate=1.0, exploration_decay=0.995, seed=None, report_every=100, output_dir=None):
+    # Headless training with num_workers actor processes, each with its own env copy of one maze,
+    # all updating a single dense Q-table in shared memory. lock_mode="hogwild" writes lock-free,
+    # "striped" guards each update with one of num_locks locks picked by state index.
+    if lock_mode not in LOCK_MODES:
+        raise ValueError(f"lock_mode must be one of {LOCK_MODES}, got {lock_mode!r}")
+    num_workers = num_workers or os.cpu_count() or 1
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    goal_pos = (grid_size[0] - 1, grid_size[1] - 1) if goal_pos is None else goal_pos
+    walls = None
+    if maze_algorithm is not None:
+        walls = generate_maze(grid_size[0], grid_size[1], algorithm=maze_algorithm, braid_fraction=braid_fraction, seed=seed)
+    env = myMazeEnv(grid_size=grid_size, number_of_walls=number_of_walls, start_pos=start_pos, goal_pos=goal_pos,
+                    enemy_pos=enemy_pos, walls=walls)
+    agent = QLearningAgent(env.observation_space.shape[0], env.action_space.n, learning_rate=learning_rate,
+                           discount_factor=discount_factor, exploration_rate=exploration_rate,
+                           exploration_decay=exploration_decay, q_table_backend="array", grid_size=grid_size)
+
+    # output_dir keeps other runs (e.g. benchmarks) from overwriting the stored model
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        q_table_path = os.path.join(output_dir, "q_table.npy")
+    else:
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        q_table_path = os.path.join(project_root, "output", "models", "q_table.npy")
+    if load_previous and os.path.exists(q_table_path):
+        agent.load_q_table(q_table_path)
+
+    # Workers rebuild the exact same maze from its wall bitmask and placed cells
+    env_kwargs = {'walls': env.walls, 'start_pos': env.start_pos, 'goal_pos': env.goal_pos, 'enemy_pos': env.enemy_pos}
+    params = {'learning_rate': learning_rate, 'discount_factor': discount_factor, 'exploration_rate': exploration_rate,
+              'exploration_decay': exploration_decay, 'max_steps_per_episode': max_steps_per_episode,
+              'random_starts': random_starts, 'seed': seed, 'report_every': report_every}
+
+    shm = SharedMemory(create=True, size=agent.q_table.nbytes)
+    shared_q = np.ndarray(agent.q_table.shape, dtype=np.float64, buffer=shm.buf)
+    shared_q[:] = agent.q_table
+    ctx = mp.get_context()
+    locks = [ctx.Lock() for _ in range(num_locks)] if lock_mode == "striped" else None
+    stop_event = ctx.Event()
+    results = ctx.Queue()
+
+    rewards_history = []
+    steps_history = []
+    success_rate = []
+    successful_episodes = 0
+    terminal_episodes = 0
+    episodes_per_worker = [0] * num_workers
+
+    start_time = time.time()
+    workers = [ctx.Process(target=_actor, args=(worker_id, num_workers, shm.name, env_kwargs, share, params,
+                                                 locks, stop_event, results), daemon=True)
+               for worker_id, share in enumerate(_split_episodes(episodes, num_workers))]
+    try:
+        for worker in workers:
+            worker.start()
+        running = num_workers
+        while running:
+            try:
+                worker_id, rewards, steps_taken, successes, episode_times, terminated = results.get(timeout=1.0)
+            except Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    raise RuntimeError("Actor processes exited without reporting")
+                continue
+            if rewards is None:
+                running -= 1
+                continue
+            # Episodes are recorded in the order their chunks arrive, interleaving the actors
+            episodes_per_worker[worker_id] += len(rewards)
+            terminal_episodes += terminated
+            for reward, steps, success, episode_time in zip(rewards, steps_taken, successes, episode_times):
+                successful_episodes += success
+                rewards_history.append(reward)
+                steps_history.append(steps)
+                success_rate.append(successful_episodes / len(rewards_history))
+                if callback is not None and not stop_event.is_set() and \
+                        not callback(len(rewards_history) - 1, reward, steps, success_rate[-1], episode_time):
+                    stop_event.set()
+        for worker in workers:
+            worker.join()
+        agent.q_table = shared_q.copy()
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        del shared_q
+        shm.close()
+        shm.unlink()
+
+    total_time = time.time() - start_time
+    total_steps = int(np.sum(steps_history))
+    steps_per_second = total_steps / total_time if total_time > 0 else float("inf")
+    agent.exploration_rate = exploration_rate * exploration_decay ** terminal_episodes
+    final_success = success_rate[-1] if success_rate else 0.0
+    print(f"\nParallel training complete!\nEpisodes: {len(rewards_history)} across {num_workers} actors ({lock_mode})\nFinal success rate: {final_success:.2%}\nSteps per second: {steps_per_second:.1f}")
+
+    agent.save_q_table(q_table_path)
+    env.close()
+    return agent, {
+        'episodes': len(rewards_history),
+        'rewards_history': rewards_history,
+        'steps_history': steps_history,
+        'success_rate': success_rate,
+        'total_steps': total_steps,
+        'total_time': total_time,
+        'steps_per_second': steps_per_second,
+        'episodes_per_worker': episodes_per_worker,
+    }
@@ -0,0 +1,161 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from src.training.train import train
+import itertools
+import argparse
+import json
+import time
+import csv
+import os
+
+# Columns of the results table, hyperparameter columns are appended after these
+RESULT_FIELDS = ['run_id', 'final_success_rate', 'mean_steps', 'wall_time', 'steps_per_second', 'error']
+
+
+def grid_runs(spec):
+    # spec: {"learning_rate": [0.1, 0.5], "seed": [0, 1, 2], ...} -> every combination
+    keys = list(spec)
+    return [dict(zip(keys, values)) for values in itertools.product(*(spec[key] for key in keys))]
+
+
+def random_runs(spec, n_samples, seed=None):
+    # List values are sampled uniformly, {"low": a, "high": b} ranges uniformly ("log": true for log-uniform)
+    rng = np.random.default_rng(seed)
+    runs = []
+    for _ in range(n_samples):
+        params = {}
+        for key, values in spec.items():
+            if isinstance(values, dict):
+                if values.get('log'):
+                    params[key] = float(np.exp(rng.uniform(np.log(values['low']), np.log(values['high']))))
+                else:
+                    params[key] = float(rng.uniform(values['low'], values['high']))
+            else:
+                params[key] = values[rng.integers(len(values))]
+        runs.append(params)
+    return runs
+
+
+def _normalize(params):
+    # JSON gives lists, train() wants tuples for cells and grid sizes
+    for key in ('grid_size', 'start_pos', 'goal_pos', 'enemy_pos'):
+        if params.get(key) is not None:
+            params[key] = tuple(params[key])
+    return params
+
+
+def _started_marker(output_dir, run_id):
+    return os.path.join(output_dir, "runs", f"run_{run_id:04d}.started")
+
+
+def _run_one(run_id, params, output_dir):
+    start_time = time.time()
+    # Tells the parent this run was executing if the pool breaks before it returns
+    os.makedirs(os.path.join(output_dir, "runs"), exist_ok=True)
+    open(_started_marker(output_dir, run_id), 'w').close()
+    run_params = _normalize(dict(params))
+    run_params.setdefault('log_verbosity', 'episodes')
+    run_params.update(headless=True, return_metrics=True, output_dir=os.path.join(output_dir, "runs", f"run_{run_id:04d}"))
+    _, metrics = train(**run_params)
+    return {
+        'run_id': run_id,
+        'final_success_rate': metrics['success_rate'][-1],
+        'mean_steps': float(np.mean(metrics['steps_history'])),
+        'wall_time': time.time() - start_time,
+        'steps_per_second': metrics['steps_per_second'],
+        'error': '',
+    }
+
+
+def run_sweep(runs, base_params=None, max_workers=None, output_dir=None, max_retries=2):
+    # Fans runs out over every core; each finished row is appended to results.csv immediately,
+    # so a crashed worker (or a killed sweep) never loses results that were already collected
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if output_dir is None:
+        output_dir = os.path.join(project_root, "output", "sweeps", time.strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(output_dir, exist_ok=True)
+    results_path = os.path.join(output_dir, "results.csv")
+    
+    all_params = [{**(base_params or {}), **params} for params in runs]
+    param_fields = sorted({key for params in all_params for key in params})
+    results = []
+    attempts = {run_id: 0 for run_id in range(len(all_params))}
+    pending = list(attempts)
+    
+    with open(results_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS + param_fields)
+        writer.writeheader()
+        
+        def record(row):
+            row.update(all_params[row['run_id']])
+            writer.writerow(row)
+            f.flush()
+            results.append(row)
+        
+        def run_pool(run_ids, workers):
+            # Returns the runs a broken pool took down: (were executing, never started)
+            for run_id in run_ids:
+                if os.path.exists(_started_marker(output_dir, run_id)):
+                    os.remove(_started_marker(output_dir, run_id))
+            executing, not_started = [], []
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(_run_one, run_id, all_params[run_id], output_dir): run_id for run_id in run_ids}
+                for future in as_completed(futures):
+                    run_id = futures[future]
+                    try:
+                        record(future.result())
+                    except BrokenProcessPool:
+                        if os.path.exists(_started_marker(output_dir, run_id)):
+                            executing.append(run_id)
+                        else:
+                            not_started.append(run_id)
+                    except Exception as e:
+                        record({'run_id': run_id, 'error': f"{type(e).__name__}: {e}"})
+            return executing, not_started
+        
+        # A hard crash (segfault, OOM kill) breaks the whole pool. Runs that never started go back to the
+        # queue as they are; the runs that were executing are suspects and get retried one per pool, where
+        # a broken pool can only mean that run crashed, so only a run that really crashes uses up attempts.
+        suspects = []
+        while pending or suspects:
+            retry = []
+            for run_id in suspects:
+                executing, not_started = run_pool([run_id], 1)
+                if executing or not_started:
+                    attempts[run_id] += 1
+                    if attempts[run_id] <= max_retries:
+                        retry.append(run_id)
+                    else:
+                        record({'run_id': run_id, 'error': "worker process crashed"})
+            executing, not_started = run_pool(pending, max_workers or os.cpu_count()) if pending else ([], [])
+            if not executing:
+                # The pool broke before any run started, so every run is a suspect
+                executing, not_started = not_started, []
+            suspects = sorted(retry + executing)
+            pending = sorted(not_started)
+    
+    results.sort(key=lambda row: row['run_id'])
+    print(f"Sweep finished: {len(results)} runs, results saved in '{results_path}'")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hyperparameter sweep over headless training runs")
+    parser.add_argument('spec', help="JSON file: {\"grid\": {...}} or {\"random\": {...}, \"samples\": N}, plus optional \"base\": {...}")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: all cores)")
+    parser.add_argument('--output-dir')
+    parser.add_argument('--seed', type=int, help="Seed for random search sampling")
+    args = parser.parse_args()
+    
+    with open(args.spec) as f:
+        spec = json.load(f)
+    if 'random' in spec:
+        runs = random_runs(spec['random'], spec.get('samples', 20), seed=args.seed)
+    else:
+        runs = grid_runs(spec['grid'])
+    run_sweep(runs, base_params=spec.get('base'), max_workers=args.workers, output_dir=args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,65 +1,213 @@
 import numpy as np
 from src.environment.Environment import myMazeEnv
-from src.agents.agent import QLearningAgent
+from src.environment.VectorEnvironment import VectorMazeEnv
+from src.environment.MazeGenerator import generate_maze
+from src.environment.RenderProcess import RendererProcess
+from src.agents.agent import QLearningAgent, UPDATE_MODES, q_array_to_dict
+from src.agents.replay import REPLAY_MODES
+from src.agents.solver import bfs_distances, optimal_q_table, optimality_gap
+from src.utils.trajectory_log import TrajectoryLogger, VERBOSITY_LEVELS
+from src.utils.profiling import PhaseTimer
+from src.utils.metrics_store import MetricsStore
+from src.utils.recording import EpisodeRecorder
+from src.training.checkpoint import (save_checkpoint, load_checkpoint, restore_planning_model, restore_replay_buffer,
+                                     restore_random_state)
+from src.training.convergence import ConvergenceMonitor
+from src.training.parallel import train_parallel, LOCK_MODES
+from src.training.kernel import train_fast
+import inspect
 import time
+from time import perf_counter
 from datetime import timedelta
+import argparse
+import json
 import os
+import random
 
-def train(episodes=1000, grid_size=(6,6), number_of_walls=10, max_steps_per_episode=100, load_previous=False, callback=None):
-    # Create environment
-    env = myMazeEnv(render_mode="human", grid_size=grid_size, number_of_walls=number_of_walls)
+def train(episodes=1000, grid_size=(6,6), number_of_walls=10, max_steps_per_episode=100, load_previous=False, callback=None,
+          headless=False, start_pos=None, goal_pos=None, enemy_pos=None, return_metrics=False, q_table_backend="dict",
+          learning_rate=0.1, discount_factor=0.95, exploration_rate=1.0, exploration_decay=0.995, seed=None, output_dir=None,
+          log_verbosity="full", log_sample_every=10, warm_start=False, report_optimality_gap=False,
+          planning_steps=0, planning_mode="uniform", maze_algorithm=None, braid_fraction=0.0,
+          render_process=False, render_every=1, render_greedy=False,
+          profile=False, profile_path=None, profile_format="json",
+          checkpoint_dir=None, checkpoint_every=None, checkpoint_seconds=None, resume=False, keep_checkpoints=3,
+          early_stopping=None, record_episodes=None, record_every=None, update_mode="one-step", trace_decay=0.9, n_steps=3,
+          replay_capacity=0, replay_batch_size=256, replay_every=32, replay_mode="uniform"):
+    # Seed before the env is built so the random walls are reproducible too
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    
+    # Resuming brings back the exact maze from the checkpoint instead of building a new one
+    checkpoint = load_checkpoint(checkpoint_dir) if resume and checkpoint_dir is not None else None
+    if checkpoint is not None:
+        start_pos, goal_pos, enemy_pos = checkpoint['start_pos'], checkpoint['goal_pos'], checkpoint['enemy_pos']
+        grid_size = checkpoint['walls'].shape
+    
+    # Headless runs never touch pygame, so positions come from arguments instead of mouse clicks.
+    # With render_process the learner is headless too and a separate process draws snapshots.
+    if headless or render_process:
+        start_pos = (0, 0) if start_pos is None else start_pos
+        goal_pos = (grid_size[0] - 1, grid_size[1] - 1) if goal_pos is None else goal_pos
+    
+    # Create environment, either with number_of_walls random walls or a generated (always solvable) maze
+    walls = None
+    if checkpoint is not None:
+        walls = checkpoint['walls']
+    elif maze_algorithm is not None:
+        walls = generate_maze(grid_size[0], grid_size[1], algorithm=maze_algorithm, braid_fraction=braid_fraction, seed=seed)
+    env = myMazeEnv(render_mode=None if headless or render_process else "human", grid_size=grid_size, number_of_walls=number_of_walls,
+                    start_pos=start_pos, goal_pos=goal_pos, enemy_pos=enemy_pos, walls=walls)
     
     # Create agent
     state_size = env.observation_space.shape[0]  # (x, y) position
     action_size = env.action_space.n  # up, down, left, right
-    agent = QLearningAgent(state_size, action_size)
+    agent = QLearningAgent(state_size, action_size, learning_rate=learning_rate, discount_factor=discount_factor,
+                           exploration_rate=exploration_rate, exploration_decay=exploration_decay,
+                           q_table_backend=q_table_backend, grid_size=grid_size,
+                           planning_steps=planning_steps, planning_mode=planning_mode,
+                           update_mode=update_mode, trace_decay=trace_decay, n_steps=n_steps,
+                           replay_capacity=replay_capacity, replay_batch_size=replay_batch_size,
+                           replay_every=replay_every, replay_mode=replay_mode)
     
     # Get project root directory
     project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     
+    # output_dir keeps parallel runs (e.g. sweeps) from overwriting each other's files
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        q_table_path = os.path.join(output_dir, "q_table.npy")
+        log_dir = os.path.join(output_dir, "navigation")
+        metrics_dir = os.path.join(output_dir, "metrics")
+        record_path = os.path.join(output_dir, "recordings.bin")
+    else:
+        q_table_path = os.path.join(project_root, "output", "models", "q_table.npy")
+        log_dir = os.path.join(project_root, "output", "train_info", "navigation")
+        metrics_dir = os.path.join(project_root, "output", "train_info", "metrics")
+        record_path = os.path.join(project_root, "output", "train_info", "recordings.bin")
+    
     # Load previous Q-table if requested and exists
-    q_table_path = os.path.join(project_root, "output", "models", "q_table.npy")
-    if load_previous and os.path.exists(q_table_path):
+    if checkpoint is not None:
+        # Full resume: Q-table (memory-mapped), epsilon, Dyna-Q model, replay buffer and RNG states
+        agent.q_table = checkpoint['q_table'] if q_table_backend == "array" else q_array_to_dict(checkpoint['q_table'])
+        agent.exploration_rate = checkpoint['exploration_rate']
+        restore_planning_model(agent, checkpoint)
+        restore_replay_buffer(agent, checkpoint)
+        restore_random_state(checkpoint)
+        print(f"Resumed from '{checkpoint['path']}' after {checkpoint['episodes_done']} episodes")
+    elif load_previous and os.path.exists(q_table_path):
         print("Loading previous Q-table...")
         agent.load_q_table(q_table_path)
         print("Previous Q-table loaded successfully!")
+    elif warm_start:
+        # Start from the exact value-iteration solution instead of zeros
+        agent.q_table = optimal_q_table(env, discount_factor=discount_factor, backend=q_table_backend)
     
-    # Training metrics
-    rewards_history = []
-    steps_history = []
-    success_rate = []
+    # BFS oracle for the per-episode optimality gap of the greedy policy
+    shortest_distances = bfs_distances(env) if report_optimality_gap else None
+    optimality_gaps = []
+    
+    # Training metrics, streamed to typed column files, read them back with src.utils.metrics_store.load_metrics
+    history = MetricsStore(metrics_dir)
     successful_episodes = 0
+    total_steps = 0
+    first_episode = 0
+    if checkpoint is not None:
+        history.extend(**checkpoint['metrics'])
+        successful_episodes = checkpoint['successful_episodes']
+        total_steps = checkpoint['total_steps']
+        first_episode = checkpoint['episodes_done']
+    
+    # Periodic checkpoints every checkpoint_every episodes and/or checkpoint_seconds seconds
+    checkpointed_episodes = first_episode if checkpoint is not None else None
+    def write_checkpoint():
+        # Nothing new since the last checkpoint (e.g. the final one right after a periodic one): keep it as it is
+        nonlocal checkpointed_episodes
+        if len(history) == checkpointed_episodes:
+            return
+        save_checkpoint(checkpoint_dir, agent, env, len(history), successful_episodes, total_steps, history,
+                        keep=keep_checkpoints)
+        checkpointed_episodes = len(history)
+    last_checkpoint_time = time.time()
+    
+    # Convergence criteria: a ConvergenceMonitor or a dict of its arguments
+    monitor = ConvergenceMonitor(**early_stopping) if isinstance(early_stopping, dict) else early_stopping
+    stop_reason = None
     
     # Timing metrics
     start_time = time.time()
-    action_names = ['Up', 'Down', 'Left', 'Right']
     
-    # Create navigation log file
-    log_path = os.path.join(project_root, "output", "train_info", "navigation.txt")
-    prog_file = open(log_path, 'w')
+    # Decoupled renderer: every render_every-th episode is drawn (0 = nothing), either the training
+    # episode itself or, with render_greedy, a separate rollout of the current greedy policy
+    renderer = None
+    if render_process and render_every:
+        renderer = RendererProcess(env.walls, env.start_pos, env.goal_pos, env.enemy_pos)
+    
+    # Per-phase timers; `timed` keeps the disabled path down to one boolean check per phase
+    profiler = PhaseTimer(trace=profile_format == "chrome") if profile else None
+    timed = profiler is not None
+    env.profiler = profiler
+    
+    # Binary navigation log, render it as text with `python -m src.utils.trajectory_log <log_dir>`
+    nav_log = TrajectoryLogger(log_dir, verbosity=log_verbosity, sample_every=log_sample_every,
+                               episodes=episodes, max_steps=max_steps_per_episode,
+                               resume_from=first_episode if checkpoint is not None else None)
     
-    for episode in range(episodes):
+    # Compact action recordings of chosen episodes, replay them with `python -m src.utils.recording`
+    recorder = None
+    if record_episodes or record_every:
+        recorder = EpisodeRecorder(record_path, select=record_episodes or (), every=record_every, max_steps=max_steps_per_episode,
+                                   resume_from=first_episode if checkpoint is not None else None)
+        recorder.add_maze(env)
+    
+    for episode in range(first_episode, episodes):
         episode_start_time = time.time()
         state = env.reset()
         total_reward = 0
         steps = 0
         done = False
+        reached_goal = False
         
-        # Print and save episode start
-        episode_info = f"\nEpisode {episode + 1}/{episodes} started\nStarting position: {state}"
-        # print(episode_info)
-        prog_file.write(episode_info + "\n")
+        # Save episode start
+        nav_log.start_episode(episode, state)
+        if recorder is not None:
+            recorder.start_episode(episode, state)
+        recording = recorder is not None and recorder.capture
+        render_episode = renderer is not None and episode % render_every == 0
+        if render_episode and render_greedy:
+            _render_greedy_rollout(env, agent, renderer, episode, max_steps_per_episode)
+            render_episode = False
+        elif render_episode:
+            renderer.push(state, episode, new_episode=True)
         
         while not done and steps < max_steps_per_episode:
+            if timed:
+                t_start = perf_counter()
             action = agent.get_action(state)
+            if timed:
+                t_action = perf_counter()
             next_state, reward, done, _, _ = env.step(action)
+            if timed:
+                t_env = perf_counter()
             
-            # Print and save step information
-            step_info = f"Step {steps + 1}:\nAction: {action_names[action]}\nCurrent position: {state}\nNext position: {next_state}\nReward: {reward:.2f}"
-            # print(step_info)
-            prog_file.write(step_info + "\n")
+            # Save step information
+            if nav_log.log_steps:
+                nav_log.log_step(steps, state, action, next_state, reward, done)
+            if recording:
+                recorder.actions[steps] = action
+            if timed:
+                t_log = perf_counter()
             
             agent.update(state, action, reward, next_state, done)
+            if timed:
+                profiler.add_step(t_start, t_action, t_env, t_log, perf_counter())
+            if render_episode:
+                if timed:
+                    t_render = perf_counter()
+                renderer.push(next_state, episode)
+                if timed:
+                    profiler.add('render', t_render, perf_counter())
             
             state = next_state
             total_reward += reward
@@ -67,47 +215,310 @@ def train(episodes=1000, grid_size=(6,6), number_of_walls=10, max_steps_per_epis
             
             if reward == 1.0:  # Reached goal
                 successful_episodes += 1
-                goal_msg = "  Goal reached!"
-                # print(goal_msg)
-                prog_file.write(goal_msg + "\n")
-            elif steps >= max_steps_per_episode:
-                max_steps_msg = "  Max steps reached!"
-                # print(max_steps_msg)
-                prog_file.write(max_steps_msg + "\n")
+                reached_goal = True
+        
+        # Multi-step update modes settle traces and pending returns, also for episodes cut off at max_steps
+        agent.end_episode()
         
         # Calculate episode time
         episode_time = time.time() - episode_start_time
         
         # Record metrics
-        rewards_history.append(total_reward)
-        steps_history.append(steps)
-        success_rate.append(successful_episodes / (episode + 1))
+        total_steps += steps
+        history.append(total_reward, steps, reached_goal, episode_time, agent.exploration_rate)
+        if report_optimality_gap:
+            optimality_gaps.append(optimality_gap(env, agent.q_table, distances=shortest_distances))
         
         # Calculate total elapsed time
         total_elapsed_time = time.time() - start_time
-        elapsed_time_str = str(timedelta(seconds=int(total_elapsed_time)))
         
-        # Print and save episode summary
-        summary = f"\nEpisode {episode + 1} Summary:\nSuccess Rate: {success_rate[-1]:.2%}\nTotal Reward: {total_reward:.2f}\nSteps taken: {steps}\nEpisode time: {episode_time:.2f} seconds\nTotal time elapsed: {elapsed_time_str}\nExploration Rate: {agent.exploration_rate:.2f}\n" + "-" * 50
-        # print(summary)
-        prog_file.write(summary + "\n")
+        # Save episode summary
+        nav_log.end_episode(steps, total_reward, reached_goal, episode_time, total_elapsed_time, agent.exploration_rate)
+        if recording:
+            recorder.end_episode(steps, total_reward, reached_goal)
+        
+        if monitor is not None:
+            stop_reason = monitor.update(episode, agent, env, reached_goal)
+        
+        if checkpoint_dir is not None and ((checkpoint_every and (episode + 1) % checkpoint_every == 0) or
+                                           (checkpoint_seconds and time.time() - last_checkpoint_time >= checkpoint_seconds)):
+            write_checkpoint()
+            last_checkpoint_time = time.time()
         
-        # Call the callback function if provided
+        # Call the callback function if provided (phase timings are passed only while profiling)
         if callback is not None:
-            if not callback(episode, total_reward, steps, success_rate[-1], episode_time):
+            if timed:
+                t_callback = perf_counter()
+                keep_going = callback(episode, total_reward, steps, history.success_rate, episode_time, phases=profiler.snapshot())
+                profiler.add('callback', t_callback, perf_counter())
+            else:
+                keep_going = callback(episode, total_reward, steps, history.success_rate, episode_time)
+            if not keep_going:
                 break
+        
+        if stop_reason is not None:
+            break
     
     # Print and save final training summary
     total_time = time.time() - start_time
-    final_summary = f"\nTraining Complete!\nTotal training time: {str(timedelta(seconds=int(total_time)))}\nFinal success rate: {success_rate[-1]:.2%}\nAverage steps per episode: {np.mean(steps_history):.2f}\nAverage reward per episode: {np.mean(rewards_history):.2f}"
-    # print(final_summary)
-    prog_file.write(final_summary + "\n")
+    steps_per_second = total_steps / total_time if total_time > 0 else float("inf")
+    final_summary = f"\nTraining Complete!\nTotal training time: {str(timedelta(seconds=int(total_time)))}\nFinal success rate: {history.success_rate:.2%}\nAverage steps per episode: {history.mean('steps'):.2f}\nAverage reward per episode: {history.mean('reward'):.2f}\nSteps per second: {steps_per_second:.1f}"
+    if stop_reason is not None:
+        final_summary += f"\nStopped early after {len(history)} episodes: {stop_reason}"
+    if report_optimality_gap:
+        final_gap = optimality_gaps[-1]
+        final_summary += f"\nGreedy policy optimality gap: {'no path to goal' if final_gap is None else f'{final_gap} steps'}"
+    if timed:
+        final_summary += "\n" + profiler.summary()
+        if profile_path is not None:
+            if profile_format == "chrome":
+                profiler.save_chrome_trace(profile_path)
+            else:
+                profiler.save_json(profile_path)
+    if headless:
+        print(final_summary)
     
     # Close the log file
-    prog_file.close()
+    if recorder is not None:
+        recorder.close()
+    nav_log.close({
+        'total_time': total_time,
+        'final_success_rate': history.success_rate,
+        'mean_steps': history.mean('steps'),
+        'mean_reward': history.mean('reward'),
+        'steps_per_second': steps_per_second,
+    })
+    history.close()
     
-    # Save the trained Q-table
+    # Save the trained Q-table, and a final checkpoint so a stopped run can be resumed
     agent.save_q_table(q_table_path)
+    if checkpoint_dir is not None:
+        write_checkpoint()
     
+    if renderer is not None:
+        renderer.close()
+        if headless:
+            print(f"Renderer dropped {renderer.dropped} snapshots")
     env.close()
-    return agent
\ No newline at end of file
+    
+    if return_metrics:
+        metrics = {
+            'episodes': len(history),
+            'rewards_history': history.column('reward'),
+            'steps_history': history.column('steps'),
+            'success_rate': history.cumulative_success_rate(),
+            'total_steps': total_steps,
+            'total_time': total_time,
+            'steps_per_second': steps_per_second,
+            'metrics_path': metrics_dir,
+        }
+        if report_optimality_gap:
+            metrics['optimality_gap'] = optimality_gaps
+        if timed:
+            metrics['phases'] = profiler.snapshot()
+        metrics['stop_reason'] = stop_reason
+        return agent, metrics
+    return agent
+
+
+def _render_greedy_rollout(env, agent, renderer, episode, max_steps):
+    # Walk the current greedy policy on the compiled tables (no learning) and stream it to the renderer
+    state = env.state_index(env.start_pos)
+    renderer.push(env.start_pos, episode, new_episode=True)
+    for _ in range(max_steps):
+        state, _, done = env.step_fast(state, agent.greedy_action(env.state_position(state)))
+        renderer.push(env.state_position(state), episode)
+        if done:
+            break
+
+
+def train_vectorized(episodes=1000, grid_size=(6,6), number_of_walls=10, max_steps_per_episode=100, num_envs=64,
+                     start_pos=(0, 0), goal_pos=None, enemy_pos=None, load_previous=False, callback=None,
+                     learning_rate=0.1, discount_factor=0.95, exploration_rate=1.0, exploration_decay=0.995, seed=None,
+                     replay_capacity=0, replay_batch_size=256, replay_every=32, replay_mode="uniform", output_dir=None):
+    # Headless training with num_envs agents stepping one maze in lockstep and sharing one dense Q-table
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    goal_pos = (grid_size[0] - 1, grid_size[1] - 1) if goal_pos is None else goal_pos
+    env = myMazeEnv(grid_size=grid_size, number_of_walls=number_of_walls,
+                    start_pos=start_pos, goal_pos=goal_pos, enemy_pos=enemy_pos)
+    vec_env = VectorMazeEnv.from_single(env, num_envs, max_steps=max_steps_per_episode)
+    agent = QLearningAgent(env.observation_space.shape[0], env.action_space.n, learning_rate=learning_rate,
+                           discount_factor=discount_factor, exploration_rate=exploration_rate,
+                           exploration_decay=exploration_decay, q_table_backend="array", grid_size=grid_size,
+                           replay_capacity=replay_capacity, replay_batch_size=replay_batch_size,
+                           replay_every=replay_every, replay_mode=replay_mode)
+    
+    # output_dir keeps other runs (e.g. benchmarks) from overwriting the stored model
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        q_table_path = os.path.join(output_dir, "q_table.npy")
+    else:
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        q_table_path = os.path.join(project_root, "output", "models", "q_table.npy")
+    if load_previous and os.path.exists(q_table_path):
+        agent.load_q_table(q_table_path)
+    
+    rewards_history = []
+    steps_history = []
+    success_rate = []
+    successful_episodes = 0
+    total_steps = 0
+    episode_rewards = np.zeros(num_envs)
+    episode_steps = np.zeros(num_envs, dtype=np.int64)
+    
+    start_time = time.time()
+    episode_starts = np.full(num_envs, start_time)
+    vec_env.reset()
+    states = vec_env.states
+    while len(rewards_history) < episodes:
+        actions = agent.get_actions(states)
+        next_states, rewards, dones, truncated = vec_env.step_indices(actions)
+        agent.update_batch(states, actions, rewards, next_states, dones)
+        
+        episode_rewards += rewards
+        episode_steps += 1
+        total_steps += num_envs
+        finished = np.flatnonzero(dones | truncated)
+        now = time.time()
+        for slot in finished:
+            if len(rewards_history) == episodes:
+                break
+            if rewards[slot] == 1.0:  # Reached goal
+                successful_episodes += 1
+            rewards_history.append(float(episode_rewards[slot]))
+            steps_history.append(int(episode_steps[slot]))
+            success_rate.append(successful_episodes / len(rewards_history))
+            # Same arguments as train()'s callback, episode_time being the wall time since this env's episode began
+            if callback is not None and not callback(len(rewards_history) - 1, rewards_history[-1], steps_history[-1], success_rate[-1],
+                                                     now - episode_starts[slot]):
+                episodes = len(rewards_history)
+                break
+        episode_rewards[finished] = 0.0
+        episode_steps[finished] = 0
+        episode_starts[finished] = now
+        states = vec_env.states
+    
+    total_time = time.time() - start_time
+    steps_per_second = total_steps / total_time if total_time > 0 else float("inf")
+    final_success = success_rate[-1] if success_rate else 0.0
+    print(f"\nVectorized training complete!\nEpisodes: {len(rewards_history)} across {num_envs} envs\nFinal success rate: {final_success:.2%}\nSteps per second: {steps_per_second:.1f}")
+    
+    agent.save_q_table(q_table_path)
+    env.close()
+    return agent, {
+        'episodes': len(rewards_history),
+        'rewards_history': rewards_history,
+        'steps_history': steps_history,
+        'success_rate': success_rate,
+        'total_steps': total_steps,
+        'total_time': total_time,
+        'steps_per_second': steps_per_second,
+    }
+
+
+def load_config(path):
+    # JSON file with any train() keyword, e.g. {"grid_size": [8, 8], "start_pos": [0, 0], "goal_pos": [7, 7]}
+    with open(path) as f:
+        config = json.load(f)
+    for key in ('grid_size', 'start_pos', 'goal_pos', 'enemy_pos'):
+        if config.get(key) is not None:
+            config[key] = tuple(config[key])
+    return config
+
+
+def _parse_pos(text):
+    row, col = text.split(',')
+    return (int(row), int(col))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the Q-learning agent without the GUI")
+    parser.add_argument('--config', help="JSON file with train() arguments")
+    parser.add_argument('--episodes', type=int)
+    parser.add_argument('--grid-size', type=int, nargs=2, metavar=('ROWS', 'COLS'))
+    parser.add_argument('--walls', type=int, dest='number_of_walls')
+    parser.add_argument('--max-steps', type=int, dest='max_steps_per_episode')
+    parser.add_argument('--start', type=_parse_pos, dest='start_pos', metavar='ROW,COL')
+    parser.add_argument('--goal', type=_parse_pos, dest='goal_pos', metavar='ROW,COL')
+    parser.add_argument('--enemy', type=_parse_pos, dest='enemy_pos', metavar='ROW,COL')
+    parser.add_argument('--render', action='store_true', help="Use the pygame window instead of headless mode")
+    parser.add_argument('--q-table', choices=['dict', 'array'], dest='q_table_backend')
+    parser.add_argument('--learning-rate', type=float)
+    parser.add_argument('--discount-factor', type=float)
+    parser.add_argument('--exploration-rate', type=float)
+    parser.add_argument('--exploration-decay', type=float)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--log-verbosity', choices=VERBOSITY_LEVELS)
+    parser.add_argument('--log-sample-every', type=int)
+    parser.add_argument('--warm-start', action='store_true', default=None, help="Initialise the Q-table from value iteration")
+    parser.add_argument('--optimality-gap', action='store_true', default=None, dest='report_optimality_gap',
+                        help="Report the greedy policy's extra steps over the BFS shortest path")
+    parser.add_argument('--planning-steps', type=int, help="Dyna-Q simulated backups per real step")
+    parser.add_argument('--planning-mode', choices=['uniform', 'prioritized'])
+    parser.add_argument('--update-mode', choices=UPDATE_MODES, help="One-step, Watkins Q(lambda) or n-step backups (array Q-table)")
+    parser.add_argument('--trace-decay', type=float, help="Lambda of --update-mode q-lambda")
+    parser.add_argument('--n-steps', type=int, help="Return length of --update-mode n-step")
+    parser.add_argument('--replay-capacity', type=int, help="Keep this many transitions for experience replay (array Q-table)")
+    parser.add_argument('--replay-batch-size', type=int, help="Transitions per replayed minibatch")
+    parser.add_argument('--replay-every', type=int, help="Replay one minibatch every N environment steps")
+    parser.add_argument('--replay-mode', choices=REPLAY_MODES, help="Sample minibatches uniformly or by TD-error priority")
+    parser.add_argument('--maze', choices=['backtracker', 'kruskal', 'wilson'], dest='maze_algorithm',
+                        help="Generate a perfect maze instead of placing random walls")
+    parser.add_argument('--braid', type=float, dest='braid_fraction', help="Fraction of dead ends to open into loops")
+    parser.add_argument('--render-process', action='store_true', default=None,
+                        help="Train headless and draw snapshots in a separate renderer process")
+    parser.add_argument('--render-every', type=int, help="With --render-process, draw every Nth episode (0 = none)")
+    parser.add_argument('--render-greedy', action='store_true', default=None,
+                        help="With --render-process, draw greedy-policy rollouts instead of training episodes")
+    parser.add_argument('--profile', action='store_true', default=None, help="Time every training phase")
+    parser.add_argument('--profile-path', help="Export the phase timings to this file")
+    parser.add_argument('--profile-format', choices=['json', 'chrome'])
+    parser.add_argument('--checkpoint-dir')
+    parser.add_argument('--checkpoint-every', type=int, help="Checkpoint every N episodes")
+    parser.add_argument('--checkpoint-seconds', type=float, help="Checkpoint every T seconds")
+    parser.add_argument('--resume', action='store_true', default=None, help="Continue from the latest checkpoint")
+    parser.add_argument('--patience', type=int, help="Early stopping: consecutive episodes a criterion must hold")
+    parser.add_argument('--q-delta-tol', type=float, help="Early stopping: max Q-value change per episode")
+    parser.add_argument('--policy-stable', action='store_true', default=None, help="Early stopping: greedy policy unchanged")
+    parser.add_argument('--success-tol', type=float, help="Early stopping: moving-average success rate plateau")
+    parser.add_argument('--match-shortest-path', action='store_true', default=None,
+                        help="Early stopping: greedy path as short as the BFS shortest path")
+    parser.add_argument('--num-envs', type=int, help="Step this many agents in lockstep (vectorized, headless)")
+    parser.add_argument('--record', nargs='+', choices=['first', 'last', 'best'], dest='record_episodes',
+                        help="Record these episodes' actions for replay")
+    parser.add_argument('--record-every', type=int, help="Also record every Nth episode")
+    parser.add_argument('--fast-kernel', action='store_true', default=None,
+                        help="Train with the fused list-based episode loop (headless, no logging or planning)")
+    parser.add_argument('--num-workers', type=int, help="Train with this many actor processes on a shared Q-table")
+    parser.add_argument('--lock-mode', choices=LOCK_MODES, help="With --num-workers, lock-free or striped-lock updates")
+    parser.add_argument('--random-starts', action='store_true', default=None,
+                        help="With --num-workers, start every episode from a random cell")
+    args = vars(parser.parse_args())
+    
+    config = load_config(args.pop('config')) if args.get('config') else {}
+    config['headless'] = not args.pop('render')
+    if args.get('grid_size'):
+        args['grid_size'] = tuple(args['grid_size'])
+    stopping = {key: args.pop(key) for key in ('patience', 'q_delta_tol', 'policy_stable', 'success_tol', 'match_shortest_path')}
+    stopping = {key: value for key, value in stopping.items() if value is not None}
+    if set(stopping) - {'patience'}:
+        config['early_stopping'] = {**config.get('early_stopping', {}), **stopping}
+    config.update({key: value for key, value in args.items() if value is not None})
+    if config.get('num_workers'):
+        # Parallel actors run their own headless loop, so options only train() understands are dropped
+        accepted = inspect.signature(train_parallel).parameters
+        train_parallel(**{key: value for key, value in config.items() if key in accepted})
+    elif config.pop('fast_kernel', None):
+        accepted = inspect.signature(train_fast).parameters
+        train_fast(**{key: value for key, value in config.items() if key in accepted})
+    elif config.get('num_envs'):
+        accepted = inspect.signature(train_vectorized).parameters
+        train_vectorized(**{key: value for key, value in config.items() if key in accepted})
+    else:
+        train(**config)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,21 @@
+import importlib
+
+
+class LazyModule:
+    # Placeholder for a heavy optional module (pygame, matplotlib) bound to a module-level name.
+    # The real import happens on first attribute access, after which the placeholder replaces itself
+    # in the owning module's globals, so later lookups cost nothing extra.
+    def __init__(self, module_name, namespace, alias):
+        self._module_name = module_name
+        self._namespace = namespace
+        self._alias = alias
+    
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._module_name)
+        self._namespace[self._alias] = module
+        return getattr(module, attr)
+
+
+def lazy_import(module_name, namespace, alias=None):
+    # usage: pygame = lazy_import("pygame", globals())
+    return LazyModule(module_name, namespace, alias or module_name)
@@ -0,0 +1,133 @@
+import numpy as np
+import json
+import os
+
+# One typed array per column, so a million episodes take ~25 MB instead of three lists of Python objects
+METRICS_COLUMNS = {
+    'reward': '<f8',
+    'steps': '<i4',
+    'success': 'i1',
+    'episode_time': '<f4',
+    'exploration_rate': '<f8',
+}
+# Columns with a windowed moving average kept up to date on every append
+AVERAGED_COLUMNS = ('reward', 'steps', 'success')
+
+
+class MetricsStore:
+    # Per-episode metrics in fixed-size typed chunks. With a path, every full chunk is appended to
+    # <path>/<column>.bin and dropped, so memory stays at one chunk however long the run is; without one,
+    # chunks stay in memory. Running aggregates (totals, cumulative success, moving averages over the
+    # last `window` episodes) are updated in O(1) per episode and never rescan the history.
+    def __init__(self, path=None, window=100, chunk_size=65536):
+        self.path = path
+        self.window = window
+        self.chunk_size = chunk_size
+        # The chunk being filled is plain lists (cheapest to append to), typed when it is spilled
+        self._chunk = {name: [] for name in METRICS_COLUMNS}
+        self._stored_chunks = []
+        self._count = 0
+        self._totals = dict.fromkeys(METRICS_COLUMNS, 0.0)
+        # Ring buffers holding the last `window` values and their running sums
+        self._ring = {name: [0.0] * window for name in AVERAGED_COLUMNS}
+        self._ring_sums = dict.fromkeys(AVERAGED_COLUMNS, 0.0)
+        self._files = None
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            self._files = {name: open(os.path.join(path, f"{name}.bin"), 'wb') for name in METRICS_COLUMNS}
+
+    def __len__(self):
+        return self._count
+
+    def append(self, reward, steps, success, episode_time=0.0, exploration_rate=0.0):
+        for name, value in (('reward', reward), ('steps', steps), ('success', success),
+                            ('episode_time', episode_time), ('exploration_rate', exploration_rate)):
+            self._chunk[name].append(value)
+            self._totals[name] += value
+        slot = self._count % self.window
+        for name, value in (('reward', reward), ('steps', steps), ('success', success)):
+            ring = self._ring[name]
+            self._ring_sums[name] += value - ring[slot]
+            ring[slot] = value
+        self._count += 1
+        if len(self._chunk['reward']) == self.chunk_size:
+            self._spill()
+
+    def extend(self, reward, steps, success, episode_time=None, exploration_rate=None):
+        # Bulk append, e.g. the histories from a checkpoint when resuming
+        n = len(reward)
+        columns = {'reward': reward, 'steps': steps, 'success': success,
+                   'episode_time': np.zeros(n) if episode_time is None else episode_time,
+                   'exploration_rate': np.zeros(n) if exploration_rate is None else exploration_rate}
+        for row in zip(*(np.asarray(columns[name]).tolist() for name in METRICS_COLUMNS)):
+            self.append(*row)
+
+    @property
+    def success_rate(self):
+        # Cumulative success rate over every episode so far
+        return self._totals['success'] / self._count if self._count else 0.0
+
+    def mean(self, name):
+        return self._totals[name] / self._count if self._count else 0.0
+
+    def moving_average(self, name):
+        # Mean of `name` over the last `window` episodes (fewer at the start of a run)
+        n = min(self._count, self.window)
+        return self._ring_sums[name] / n if n else 0.0
+
+    def column(self, name):
+        # The full column as one array: spilled chunks (read from disk) plus the chunk being filled
+        parts = list(self._stored_chunks_of(name))
+        parts.append(np.asarray(self._chunk[name], dtype=METRICS_COLUMNS[name]))
+        return np.concatenate(parts)
+
+    def cumulative_success_rate(self):
+        success = self.column('success')
+        return np.cumsum(success) / np.arange(1, len(success) + 1)
+
+    def flush(self):
+        # Pushes the partly filled chunk to disk as well, leaving an empty chunk behind
+        if self._files is not None and self._chunk['reward']:
+            self._spill()
+
+    def close(self):
+        if self._files is None:
+            return
+        self.flush()
+        for f in self._files.values():
+            f.close()
+        self._files = None
+        meta = {
+            'episodes': self._count,
+            'columns': METRICS_COLUMNS,
+            'success_rate': float(self.success_rate),
+            'means': {name: float(self.mean(name)) for name in METRICS_COLUMNS},
+        }
+        with open(os.path.join(self.path, "meta.json"), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    def _spill(self):
+        typed = {name: np.asarray(values, dtype=METRICS_COLUMNS[name]) for name, values in self._chunk.items()}
+        if self._files is None:
+            self._stored_chunks.append(typed)
+        else:
+            for name, f in self._files.items():
+                typed[name].tofile(f)
+                f.flush()
+        self._chunk = {name: [] for name in METRICS_COLUMNS}
+
+    def _stored_chunks_of(self, name):
+        if self.path is None:
+            return (chunk[name] for chunk in self._stored_chunks)
+        return [_memmap(os.path.join(self.path, f"{name}.bin"), METRICS_COLUMNS[name])]
+
+
+def load_metrics(path):
+    # Memory-mapped columns of a closed store, e.g. load_metrics("output/train_info/metrics")['reward']
+    return {name: _memmap(os.path.join(path, f"{name}.bin"), dtype) for name, dtype in METRICS_COLUMNS.items()}
+
+
+def _memmap(path, dtype):
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r')
@@ -0,0 +1,73 @@
+from time import perf_counter
+import json
+
+# Training loop phases, in the order they happen within a step
+PHASES = ('action', 'env_step', 'render', 'update', 'log', 'callback')
+
+
+class PhaseTimer:
+    # Cumulative wall time and call counts per training phase. train() only touches it when profiling
+    # is switched on, so a disabled profiler costs one local boolean check per phase.
+    # With trace=True every interval is also kept (up to max_events) for a Chrome trace export.
+    def __init__(self, trace=False, max_events=1_000_000):
+        self.totals = dict.fromkeys(PHASES, 0.0)
+        self.counts = dict.fromkeys(PHASES, 0)
+        self.trace = trace
+        self.max_events = max_events
+        self.events = []
+        self.origin = perf_counter()
+        # Render time reported by env.step since the last add_step
+        self._pending_render = 0.0
+    
+    def add(self, phase, start, end):
+        self.totals[phase] += end - start
+        self.counts[phase] += 1
+        if self.trace and len(self.events) < self.max_events:
+            self.events.append((phase, start, end))
+    
+    def add_step(self, t_start, t_action, t_env, t_log, t_update):
+        # One call per step for the four back-to-back phases of the inner loop.
+        # env.step reports its own render time separately, so it is taken out of env_step here.
+        totals, counts = self.totals, self.counts
+        totals['action'] += t_action - t_start
+        totals['env_step'] += t_env - t_action - self._pending_render
+        totals['log'] += t_log - t_env
+        totals['update'] += t_update - t_log
+        counts['action'] += 1
+        counts['env_step'] += 1
+        counts['log'] += 1
+        counts['update'] += 1
+        self._pending_render = 0.0
+        if self.trace and len(self.events) < self.max_events:
+            self.events.extend((('action', t_start, t_action), ('env_step', t_action, t_env),
+                                ('log', t_env, t_log), ('update', t_log, t_update)))
+    
+    def add_render(self, start, end):
+        # Called from inside env.step, see add_step
+        self._pending_render += end - start
+        self.add('render', start, end)
+    
+    def snapshot(self):
+        return {phase: {'total': self.totals[phase], 'count': self.counts[phase]} for phase in PHASES}
+    
+    def summary(self):
+        # Human-readable breakdown for the final training summary
+        measured = sum(self.totals.values()) or 1.0
+        lines = ["Phase breakdown:"]
+        for phase in PHASES:
+            total, count = self.totals[phase], self.counts[phase]
+            per_call = total / count * 1e6 if count else 0.0
+            lines.append(f"  {phase:<9} {total:9.3f} s  {total / measured:6.1%}  {count:>10} calls  {per_call:8.2f} us/call")
+        return "\n".join(lines)
+    
+    def save_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+    
+    def save_chrome_trace(self, path):
+        # Open in chrome://tracing or https://ui.perfetto.dev
+        events = [{'name': phase, 'ph': 'X', 'pid': 0, 'tid': 0,
+                   'ts': (start - self.origin) * 1e6, 'dur': (end - start) * 1e6}
+                  for phase, start, end in self.events]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
@@ -0,0 +1,311 @@
+import numpy as np
+import argparse
+import os
+import struct
+
+# Recorded episodes are stored as their uint8 action sequence only: transitions are deterministic,
+# so start cell + maze + actions reproduce every position. One file holds everything:
+#   magic | action bytes of all episodes | wall bitmasks of all mazes | MAZE_DTYPE index | EPISODE_DTYPE index | footer
+# The footer gives the byte offsets and counts of the two indexes, so a reader seeks straight to them.
+MAGIC = b"MAZEREC1"
+FOOTER = struct.Struct('<qqqq')
+MAZE_DTYPE = np.dtype([
+    ('rows', '<i4'), ('cols', '<i4'), ('offset', '<i8'),
+    ('start_row', '<i4'), ('start_col', '<i4'), ('goal_row', '<i4'), ('goal_col', '<i4'),
+    ('enemy_row', '<i4'), ('enemy_col', '<i4'),  # -1 when there is no enemy
+])
+EPISODE_DTYPE = np.dtype([
+    ('episode', '<i4'), ('maze_id', '<i4'), ('start_row', '<i4'), ('start_col', '<i4'),
+    ('offset', '<i8'), ('length', '<i4'), ('total_reward', '<f8'), ('success', 'i1'),
+    ('tags', '<u1'),
+])
+# Why an episode was kept; one episode can carry several tags
+TAGS = {'first': 1, 'last': 2, 'best': 4, 'every': 8}
+
+
+class EpisodeRecorder:
+    # Keeps the chosen episodes of a run: 'first', 'last', 'best' (highest total reward, then fewest steps)
+    # and every `every`-th one. Episodes whose fate is decided at the end (last/best) are captured into a
+    # preallocated bytearray, so recording costs one byte store per step; the rest skip capture entirely.
+    # resume_from: first episode of a resumed run, the episodes an earlier run recorded before it are kept.
+    def __init__(self, path, select=('first', 'last', 'best'), every=None, max_steps=100, resume_from=None):
+        unknown = set(select) - set(TAGS)
+        if unknown:
+            raise ValueError(f"Unknown episode selection: {sorted(unknown)}")
+        self.path = path
+        self.select = set(select)
+        self.every = every
+        self.actions = bytearray(max_steps)
+        self.capture = False
+        previous = _read_previous(path) if resume_from is not None else None
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+        self._offset = len(MAGIC)
+        self._mazes = []
+        self._maze_index = []
+        self._index = []
+        self._last = None
+        self._best = None
+        self._first_done = False
+        self._episode = None
+        self._start = None
+        self._maze_id = 0
+        if resume_from is not None:
+            self._first_done = resume_from > 0
+            if previous is not None:
+                self._carry_over(*previous, resume_from)
+
+    def add_maze(self, env):
+        # Registers env's maze and returns its id; episodes recorded afterwards refer to it.
+        # A maze that is already registered (a resumed run's) keeps its id.
+        walls = np.ascontiguousarray(env.walls, dtype=np.uint8)
+        enemy = env.enemy_pos if env.enemy_pos is not None else (-1, -1)
+        entry = (walls.shape[0], walls.shape[1], 0, env.start_pos[0], env.start_pos[1],
+                 env.goal_pos[0], env.goal_pos[1], enemy[0], enemy[1])
+        for maze_id, (known_walls, known_entry) in enumerate(zip(self._mazes, self._maze_index)):
+            if tuple(known_entry)[3:] == entry[3:] and np.array_equal(known_walls, walls):
+                self._maze_id = maze_id
+                return maze_id
+        self._mazes.append(walls)
+        self._maze_index.append(entry)
+        self._maze_id = len(self._mazes) - 1
+        return self._maze_id
+
+    def start_episode(self, episode, start_pos):
+        self._episode = episode
+        self._start = (int(start_pos[0]), int(start_pos[1]))
+        self.capture = bool(self.select & {'last', 'best'}) or self._tags_now() != 0
+
+    def end_episode(self, steps, total_reward, success):
+        if not self.capture:
+            return
+        actions = bytes(self.actions[:steps])
+        record = [self._episode, self._maze_id, self._start[0], self._start[1], 0, steps, total_reward, success, 0]
+        tags = self._tags_now()
+        self._first_done = True
+        if tags:
+            record[8] = tags
+            self._write(record, actions)
+        if 'last' in self.select:
+            self._last = (record, actions)
+        if 'best' in self.select and (self._best is None or (total_reward, -steps) > (self._best[0][6], -self._best[0][5])):
+            self._best = (record, actions)
+
+    def close(self):
+        # last and best are only known now; an episode already written just gains the tag
+        for tag, kept in (('last', self._last), ('best', self._best)):
+            if kept is None:
+                continue
+            record, actions = kept
+            if record[8]:
+                record[8] |= TAGS[tag]
+            else:
+                record[8] = TAGS[tag]
+                self._write(record, actions)
+
+        maze_index = np.array(self._maze_index, dtype=MAZE_DTYPE)
+        for i, walls in enumerate(self._mazes):
+            maze_index[i]['offset'] = self._offset
+            self._file.write(walls.tobytes())
+            self._offset += walls.nbytes
+        maze_index_offset = self._offset
+        self._file.write(maze_index.tobytes())
+        episode_index_offset = maze_index_offset + maze_index.nbytes
+        episode_index = np.array([tuple(record) for record in self._index], dtype=EPISODE_DTYPE)
+        episode_index.sort(order='episode')
+        self._file.write(episode_index.tobytes())
+        self._file.write(FOOTER.pack(maze_index_offset, len(maze_index), episode_index_offset, len(episode_index)))
+        self._file.close()
+
+    def _carry_over(self, mazes, maze_index, episodes, actions, resume_from):
+        # Rewrites the earlier run's episodes before resume_from. 'last' no longer applies to them and the
+        # earlier 'best' competes with the new episodes again, so both tags are taken off and re-decided at close.
+        self._mazes = list(mazes)
+        self._maze_index = [tuple(entry) for entry in maze_index.tolist()]
+        for record, episode_actions in zip(episodes.tolist(), actions):
+            if record[0] >= resume_from:
+                continue
+            record = list(record)
+            was_best = record[8] & TAGS['best']
+            record[8] &= ~(TAGS['last'] | TAGS['best'])
+            if record[8]:
+                self._write(record, episode_actions)
+            if was_best and 'best' in self.select:
+                self._best = (record, episode_actions)
+
+    def _tags_now(self):
+        tags = 0
+        if 'first' in self.select and not self._first_done:
+            tags |= TAGS['first']
+        if self.every and self._episode % self.every == 0:
+            tags |= TAGS['every']
+        return tags
+
+    def _write(self, record, actions):
+        record[4] = self._offset
+        self._file.write(actions)
+        self._offset += len(actions)
+        self._index.append(record)
+
+
+def _read_previous(path):
+    # (mazes, maze index, episode index, action bytes per episode) of an existing recording, read into
+    # memory before the file is rewritten; None when there is none or it was never closed
+    if not os.path.exists(path):
+        return None
+    try:
+        recording = Recording(path)
+    except ValueError as e:
+        print(f"Not keeping the episodes in '{path}': {e}")
+        return None
+    previous = ([np.array(recording.walls(i)) for i in range(len(recording.mazes))], recording.mazes.copy(),
+                recording.episodes.copy(), [bytes(recording.actions(i)) for i in range(len(recording))])
+    del recording
+    return previous
+
+
+class Recording:
+    # Read side: the indexes are loaded, the action bytes are memory-mapped and sliced per episode
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not an episode recording")
+            size = f.seek(0, os.SEEK_END)
+            if size < len(MAGIC) + FOOTER.size:
+                raise ValueError(f"{path} is incomplete (the recording run did not finish)")
+            f.seek(-FOOTER.size, os.SEEK_END)
+            maze_index_offset, n_mazes, episode_index_offset, n_episodes = FOOTER.unpack(f.read(FOOTER.size))
+        if not (len(MAGIC) <= maze_index_offset and maze_index_offset + n_mazes * MAZE_DTYPE.itemsize == episode_index_offset
+                and episode_index_offset + n_episodes * EPISODE_DTYPE.itemsize == size - FOOTER.size):
+            raise ValueError(f"{path} is incomplete (the recording run did not finish)")
+        self._data = np.memmap(path, dtype=np.uint8, mode='r')
+        self.mazes = np.frombuffer(self._data, dtype=MAZE_DTYPE, count=n_mazes, offset=maze_index_offset)
+        self.episodes = np.frombuffer(self._data, dtype=EPISODE_DTYPE, count=n_episodes, offset=episode_index_offset)
+
+    def __len__(self):
+        return len(self.episodes)
+
+    def find(self, selector):
+        # Index of a recorded episode: a tag name ('first', 'last', 'best') or a training episode number
+        if selector in TAGS:
+            matches = np.flatnonzero(self.episodes['tags'] & TAGS[selector])
+        else:
+            matches = np.flatnonzero(self.episodes['episode'] == int(selector))
+        if len(matches) == 0:
+            raise KeyError(f"No recorded episode matches {selector!r}")
+        return int(matches[0])
+
+    def actions(self, i):
+        record = self.episodes[i]
+        return self._data[record['offset']:record['offset'] + record['length']]
+
+    def walls(self, maze_id):
+        maze = self.mazes[maze_id]
+        return self._data[maze['offset']:maze['offset'] + maze['rows'] * maze['cols']].reshape(maze['rows'], maze['cols'])
+
+    def env(self, i, render_mode=None, cell_size=80):
+        from src.environment.Environment import myMazeEnv
+        maze = self.mazes[self.episodes[i]['maze_id']]
+        enemy = None if maze['enemy_row'] < 0 else (int(maze['enemy_row']), int(maze['enemy_col']))
+        return myMazeEnv(render_mode=render_mode, walls=np.array(self.walls(self.episodes[i]['maze_id'])), cell_size=cell_size,
+                         start_pos=(int(maze['start_row']), int(maze['start_col'])),
+                         goal_pos=(int(maze['goal_row']), int(maze['goal_col'])), enemy_pos=enemy)
+
+    def positions(self, i, env=None):
+        # (length + 1, 2) array of cells visited, start cell included, replayed on the env's tables
+        env = self.env(i) if env is None else env
+        record = self.episodes[i]
+        state = env.state_index((int(record['start_row']), int(record['start_col'])))
+        states = [state]
+        for action in self.actions(i).tolist():
+            state = env.step_fast(state, action)[0]
+            states.append(state)
+        return np.column_stack(np.divmod(np.array(states), env.grid_size[1]))
+
+
+def tag_names(tags):
+    return [name for name, bit in TAGS.items() if tags & bit]
+
+
+def replay(path, selector='best', speed=5.0, start_step=0, cell_size=None):
+    # Plays a recorded episode in a pygame window, `speed` in steps per second.
+    # Keys: space pause, left/right step back/forward (seek), up/down double/halve speed,
+    # home/end jump to start/end, n/p next/previous recorded episode, q or escape quit.
+    import pygame
+    recording = Recording(path)
+    current = recording.find(selector)
+    while current is not None:
+        record = recording.episodes[current]
+        maze = recording.mazes[record['maze_id']]
+        size = cell_size or max(4, min(80, 800 // max(int(maze['rows']), int(maze['cols']))))
+        env = recording.env(current, render_mode="human", cell_size=size)
+        env.reset()
+        env.render()
+        positions = recording.positions(current, env)
+        step = min(start_step, len(positions) - 1)
+        paused = False
+        clock = pygame.time.Clock()
+        next_episode = None
+        running = True
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key in (pygame.K_q, pygame.K_ESCAPE):
+                        running = False
+                    elif event.key == pygame.K_SPACE:
+                        paused = not paused
+                    elif event.key == pygame.K_RIGHT:
+                        step, paused = min(step + 1, len(positions) - 1), True
+                    elif event.key == pygame.K_LEFT:
+                        step, paused = max(step - 1, 0), True
+                    elif event.key == pygame.K_UP:
+                        speed *= 2
+                    elif event.key == pygame.K_DOWN:
+                        speed = max(speed / 2, 0.25)
+                    elif event.key == pygame.K_HOME:
+                        step = 0
+                    elif event.key == pygame.K_END:
+                        step = len(positions) - 1
+                    elif event.key in (pygame.K_n, pygame.K_p):
+                        next_episode = (current + (1 if event.key == pygame.K_n else -1)) % len(recording)
+                        running = False
+            row, col = positions[step]
+            env._draw(row, col)
+            pygame.display.flip()
+            pygame.display.set_caption(f"Episode {record['episode'] + 1} ({', '.join(tag_names(record['tags'])) or 'recorded'}) "
+                                       f"- step {step}/{len(positions) - 1} - {speed:g} steps/s{' - paused' if paused else ''}")
+            if not paused and step < len(positions) - 1:
+                step += 1
+            clock.tick(speed if not paused else 30)
+        env.close()
+        current, start_step = next_episode, 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List or replay episodes recorded during training")
+    parser.add_argument('path', nargs='?', help="Recording file (default: output/train_info/recordings.bin)")
+    parser.add_argument('--list', action='store_true', help="Print the recorded episodes and exit")
+    parser.add_argument('--episode', default='best', help="first, last, best or a training episode number")
+    parser.add_argument('--speed', type=float, default=5.0, help="Steps per second")
+    parser.add_argument('--start-step', type=int, default=0, help="Start the replay at this step")
+    parser.add_argument('--cell-size', type=int)
+    args = parser.parse_args()
+
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    path = args.path or os.path.join(project_root, "output", "train_info", "recordings.bin")
+    if args.list:
+        recording = Recording(path)
+        print(f"{'episode':>8} {'tags':<18} {'steps':>7} {'reward':>8} {'success':>8} {'start':>10} {'maze':>5}")
+        for r in recording.episodes:
+            start = f"({r['start_row']}, {r['start_col']})"
+            print(f"{r['episode'] + 1:>8} {','.join(tag_names(r['tags'])):<18} {r['length']:>7} {r['total_reward']:>8.2f} "
+                  f"{str(bool(r['success'])):>8} {start:>10} {r['maze_id']:>5}")
+        return
+    replay(path, args.episode, speed=args.speed, start_step=args.start_step, cell_size=args.cell_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import numpy as np
+from datetime import timedelta
+import argparse
+import json
+import os
+
+# Fixed-width records, appended as raw bytes and read back with np.memmap
+STEP_DTYPE = np.dtype([
+    ('episode', '<i4'), ('step', '<i4'),
+    ('row', '<i4'), ('col', '<i4'), ('action', 'i1'),
+    ('next_row', '<i4'), ('next_col', '<i4'),
+    ('reward', '<f4'), ('done', 'i1'),
+])
+EPISODE_DTYPE = np.dtype([
+    ('episode', '<i4'), ('start_row', '<i4'), ('start_col', '<i4'), ('steps', '<i4'),
+    ('total_reward', '<f8'), ('success', 'i1'), ('episode_time', '<f8'),
+    ('elapsed_time', '<f8'), ('exploration_rate', '<f8'),
+])
+
+# off: nothing, episodes: one summary record per episode,
+# sampled: summaries + steps of every Nth (and the last) episode, full: summaries + every step
+VERBOSITY_LEVELS = ('off', 'episodes', 'sampled', 'full')
+ACTION_NAMES = ['Up', 'Down', 'Left', 'Right']
+
+
+class TrajectoryLogger:
+    # resume_from: first episode of a resumed run. The existing log is kept up to that episode (records a
+    # crashed run wrote after its last checkpoint are cut off) and the new episodes are appended to it.
+    def __init__(self, log_dir, verbosity="full", sample_every=10, episodes=None, max_steps=None, chunk_size=65536,
+                 resume_from=None):
+        if verbosity not in VERBOSITY_LEVELS:
+            raise ValueError(f"Unknown log verbosity: {verbosity}")
+        self.log_dir = log_dir
+        self.verbosity = verbosity
+        self.sample_every = sample_every
+        self.episodes = episodes
+        self.max_steps = max_steps
+        self.log_steps = False
+        if verbosity == 'off':
+            return
+        
+        os.makedirs(log_dir, exist_ok=True)
+        self._step_buffer = np.zeros(chunk_size, dtype=STEP_DTYPE)
+        self._episode_buffer = np.zeros(max(chunk_size // 64, 1), dtype=EPISODE_DTYPE)
+        self._n_steps = 0
+        self._n_episodes = 0
+        self._step_file = _open_log(os.path.join(log_dir, "steps.bin"), STEP_DTYPE, resume_from)
+        self._episode_file = _open_log(os.path.join(log_dir, "episodes.bin"), EPISODE_DTYPE, resume_from)
+        self._episode = 0
+        self._start = (0, 0)
+    
+    def start_episode(self, episode, start_pos):
+        if self.verbosity == 'off':
+            return
+        self._episode = episode
+        self._start = start_pos
+        last_episode = self.episodes is not None and episode == self.episodes - 1
+        self.log_steps = self.verbosity == 'full' or (
+            self.verbosity == 'sampled' and (episode % self.sample_every == 0 or last_episode))
+    
+    def log_step(self, step, state, action, next_state, reward, done):
+        # Callers check self.log_steps first, so skipped episodes cost one attribute read per step
+        self._step_buffer[self._n_steps] = (self._episode, step, state[0], state[1], action,
+                                            next_state[0], next_state[1], reward, done)
+        self._n_steps += 1
+        if self._n_steps == len(self._step_buffer):
+            self._flush_steps()
+    
+    def end_episode(self, steps, total_reward, success, episode_time, elapsed_time, exploration_rate):
+        if self.verbosity == 'off':
+            return
+        self._episode_buffer[self._n_episodes] = (self._episode, self._start[0], self._start[1], steps, total_reward,
+                                                  success, episode_time, elapsed_time, exploration_rate)
+        self._n_episodes += 1
+        if self._n_episodes == len(self._episode_buffer):
+            self._flush_episodes()
+    
+    def close(self, summary=None):
+        if self.verbosity == 'off':
+            return
+        self._flush_steps()
+        self._flush_episodes()
+        self._step_file.close()
+        self._episode_file.close()
+        meta = {
+            'verbosity': self.verbosity,
+            'sample_every': self.sample_every,
+            'episodes': self.episodes,
+            'max_steps': self.max_steps,
+            'step_dtype': STEP_DTYPE.descr,
+            'episode_dtype': EPISODE_DTYPE.descr,
+            'summary': summary or {},
+        }
+        with open(os.path.join(self.log_dir, "meta.json"), 'w') as f:
+            json.dump(meta, f, indent=2)
+    
+    def _flush_steps(self):
+        self._step_buffer[:self._n_steps].tofile(self._step_file)
+        self._n_steps = 0
+    
+    def _flush_episodes(self):
+        self._episode_buffer[:self._n_episodes].tofile(self._episode_file)
+        self._n_episodes = 0
+
+
+def _open_log(path, dtype, resume_from):
+    if resume_from is None or not os.path.exists(path):
+        return open(path, 'wb')
+    # Records are in episode order: keep those before resume_from, dropping any torn record at the end
+    count = os.path.getsize(path) // dtype.itemsize
+    keep = 0
+    if count:
+        episodes = np.memmap(path, dtype=dtype, mode='r', shape=(count,))['episode']
+        keep = int(np.searchsorted(episodes, resume_from, side='left'))
+        del episodes
+    f = open(path, 'r+b')
+    f.truncate(keep * dtype.itemsize)
+    f.seek(0, os.SEEK_END)
+    return f
+
+
+def load_log(log_dir):
+    # Memory-mapped views, so even huge logs open instantly
+    with open(os.path.join(log_dir, "meta.json")) as f:
+        meta = json.load(f)
+    return meta, _memmap(os.path.join(log_dir, "steps.bin"), STEP_DTYPE), _memmap(os.path.join(log_dir, "episodes.bin"), EPISODE_DTYPE)
+
+
+def _memmap(path, dtype):
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r')
+
+
+def render_text(log_dir, out_file):
+    # Rebuild the old human-readable navigation.txt layout from the binary log
+    meta, steps, episodes = load_log(log_dir)
+    total = meta['episodes'] or len(episodes)
+    max_steps = meta['max_steps']
+    
+    # Step records are in episode order, so each episode's steps are one contiguous slice
+    bounds = np.searchsorted(steps['episode'], episodes['episode'], side='left'), np.searchsorted(steps['episode'], episodes['episode'], side='right')
+    # Success rate over the logged episodes, which is the run's own rate whenever the log starts at episode 0
+    success_rates = np.cumsum(episodes['success']) / np.arange(1, len(episodes) + 1)
+    for summary, lo, hi, success_rate in zip(episodes, *bounds, success_rates):
+        episode = int(summary['episode'])
+        out_file.write(f"\nEpisode {episode + 1}/{total} started\nStarting position: ({summary['start_row']}, {summary['start_col']})\n")
+        for record in steps[lo:hi]:
+            out_file.write(f"Step {record['step'] + 1}:\nAction: {ACTION_NAMES[record['action']]}\n"
+                           f"Current position: ({record['row']}, {record['col']})\n"
+                           f"Next position: ({record['next_row']}, {record['next_col']})\nReward: {record['reward']:.2f}\n")
+            if record['reward'] == 1.0:
+                out_file.write("  Goal reached!\n")
+            elif max_steps is not None and record['step'] + 1 >= max_steps:
+                out_file.write("  Max steps reached!\n")
+        out_file.write(f"\nEpisode {episode + 1} Summary:\nSuccess Rate: {success_rate:.2%}\nTotal Reward: {summary['total_reward']:.2f}\n"
+                       f"Steps taken: {summary['steps']}\nEpisode time: {summary['episode_time']:.2f} seconds\n"
+                       f"Total time elapsed: {str(timedelta(seconds=int(summary['elapsed_time'])))}\n"
+                       f"Exploration Rate: {summary['exploration_rate']:.2f}\n" + "-" * 50 + "\n")
+    
+    final = meta['summary']
+    if final:
+        out_file.write(f"\nTraining Complete!\nTotal training time: {str(timedelta(seconds=int(final['total_time'])))}\n"
+                       f"Final success rate: {final['final_success_rate']:.2%}\nAverage steps per episode: {final['mean_steps']:.2f}\n"
+                       f"Average reward per episode: {final['mean_reward']:.2f}\nSteps per second: {final['steps_per_second']:.1f}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a binary trajectory log as the old navigation.txt text")
+    parser.add_argument('log_dir')
+    parser.add_argument('--out', help="Output text file (default: navigation.txt next to the log)")
+    args = parser.parse_args()
+    
+    out_path = args.out or os.path.join(os.path.dirname(os.path.abspath(args.log_dir)), "navigation.txt")
+    with open(out_path, 'w') as f:
+        render_text(args.log_dir, f)
+    print(f"Navigation log written to '{out_path}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,82 +1,228 @@
-import matplotlib.pyplot as plt
 import numpy as np
 import os
+from src.agents.agent import q_dict_to_array
+from src.utils.lazy_import import lazy_import
 
-def plot_learning_curve(rewards_history, steps_history, success_rate):
+# matplotlib is only imported when a plot is actually made
+plt = lazy_import("matplotlib.pyplot", globals(), alias="plt")
+matplotlib_figure = lazy_import("matplotlib.figure", globals(), alias="matplotlib_figure")
+
+MAX_PLOT_POINTS = 4000  # per line; a 1M-episode history is reduced to this many points before plotting
+ACTION_NAMES = ['Up', 'Down', 'Left', 'Right']
+# Arrow directions (dx, dy) per action in image coordinates, rows growing downwards
+ARROW_DX = np.array([0, 0, -1, 1])
+ARROW_DY = np.array([-1, 1, 0, 0])
+
+
+def downsample_minmax(values, max_points=MAX_PLOT_POINTS):
+    # (x, y) keeping the min and the max of each of max_points // 2 equal buckets, in episode order,
+    # so spikes survive the reduction. Short series come back unchanged.
+    values = np.asarray(values)
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n), values
+    bucket = -(-n // (max_points // 2))
+    full = n - n % bucket
+    starts = np.arange(0, full, bucket)
+    blocks = values[:full].reshape(-1, bucket)
+    lo = starts + blocks.argmin(axis=1)
+    hi = starts + blocks.argmax(axis=1)
+    if full < n:
+        lo = np.append(lo, full + values[full:].argmin())
+        hi = np.append(hi, full + values[full:].argmax())
+    x = np.sort(np.concatenate([lo, hi]))
+    return x, values[x]
+
+
+def moving_average(values, window):
+    # O(n) running mean through a cumulative sum, x positions start at window - 1
+    cumulative = np.cumsum(np.asarray(values, dtype=float))
+    averages = cumulative[window - 1:].copy()
+    averages[1:] -= cumulative[:-window]
+    return np.arange(window - 1, len(cumulative)), averages / window
+
+
+def plot_learning_curve(rewards_history, steps_history, success_rate, output_path=None, window_size=10,
+                        max_points=MAX_PLOT_POINTS):
     # Get project root directory
     project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    output_path = os.path.join(project_root, "output", "visualizations", "learning_curves.png")
+    if output_path is None:
+        output_path = os.path.join(project_root, "output", "visualizations", "learning_curves.png")
 
     # Create a figure with 3 subplots
     fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(10, 15))
-    
+
     # Plot rewards
-    ax1.plot(rewards_history, label='Episode Reward')
+    ax1.plot(*downsample_minmax(rewards_history, max_points), label='Episode Reward')
     ax1.set_title('Rewards per Episode')
     ax1.set_xlabel('Episode')
     ax1.set_ylabel('Total Reward')
     ax1.grid(True)
-    
+
     # Plot steps
-    ax2.plot(steps_history, label='Steps per Episode', color='orange')
+    ax2.plot(*downsample_minmax(steps_history, max_points), label='Steps per Episode', color='orange')
     ax2.set_title('Steps per Episode')
     ax2.set_xlabel('Episode')
     ax2.set_ylabel('Number of Steps')
     ax2.grid(True)
-    
-    # Plot success rate
-    ax3.plot(success_rate, label='Success Rate', color='green')
+
+    # Plot success rate (cumulative, so it is smooth and plain striding keeps its shape)
+    stride = max(1, -(-len(success_rate) // max_points))
+    ax3.plot(np.arange(0, len(success_rate), stride), np.asarray(success_rate)[::stride], label='Success Rate', color='green')
     ax3.set_title('Success Rate over Time')
     ax3.set_xlabel('Episode')
     ax3.set_ylabel('Success Rate')
     ax3.grid(True)
-    
-    # Add moving averages
-    window_size = 10
+
+    # Add moving averages, computed over the full history and then reduced like the raw lines
     if len(rewards_history) >= window_size:
-        rewards_ma = np.convolve(rewards_history, np.ones(window_size)/window_size, mode='valid')
-        steps_ma = np.convolve(steps_history, np.ones(window_size)/window_size, mode='valid')
-        
-        ax1.plot(range(window_size-1, len(rewards_history)), rewards_ma, 
-                label=f'{window_size}-Episode Moving Average', color='red')
-        ax2.plot(range(window_size-1, len(steps_history)), steps_ma, 
-                label=f'{window_size}-Episode Moving Average', color='red')
-    
+        for ax, history in ((ax1, rewards_history), (ax2, steps_history)):
+            x, averages = moving_average(history, window_size)
+            keep = downsample_minmax(averages, max_points)[0]
+            ax.plot(x[keep], averages[keep], label=f'{window_size}-Episode Moving Average', color='red')
+
     # Add legends
     ax1.legend()
     ax2.legend()
     ax3.legend()
-    
+
     # Adjust layout and save
     plt.tight_layout()
     plt.savefig(output_path)
     plt.close()
 
-def visualize_q_table(q_table, grid_size):
+def visualize_q_table(q_table, grid_size, output_path=None, view="actions", max_arrows=40):
+    # view="actions": one Q-value heatmap per action. view="policy": max Q per cell with an arrow for the
+    # greedy action, arrows thinned out to at most max_arrows per side on big grids.
     # Get project root directory
     project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    output_path = os.path.join(project_root, "output", "visualizations", "q_table_visualization.png")
-    
-    # Create a figure with 4 subplots (one for each action)
-    fig, axes = plt.subplots(2, 2, figsize=(12, 12))
-    axes = axes.flatten()
-    
-    action_names = ['Up', 'Down', 'Left', 'Right']
-    
-    for action in range(4):
-        # Create a grid to store Q-values
-        q_grid = np.zeros(grid_size)
-        
-        # Fill in Q-values for each state
-        for state in q_table:
-            if state in q_table:
-                q_grid[state] = q_table[state][action]
-        
-        # Plot heatmap
-        im = axes[action].imshow(q_grid, cmap='viridis')
-        axes[action].set_title(f'Q-values for {action_names[action]}')
-        plt.colorbar(im, ax=axes[action])
-    
+    if output_path is None:
+        output_path = os.path.join(project_root, "output", "visualizations", "q_table_visualization.png")
+
+    # Dict tables are converted in one vectorized pass, dense tables already are the grid
+    q_grid = q_table if isinstance(q_table, np.ndarray) else q_dict_to_array(q_table, grid_size)
+
+    if view == "policy":
+        fig, ax = plt.subplots(figsize=(12, 12))
+        im = ax.imshow(q_grid.max(axis=2), cmap='viridis')
+        stride = max(1, -(-max(q_grid.shape[:2]) // max_arrows))
+        rows, cols = np.mgrid[0:q_grid.shape[0]:stride, 0:q_grid.shape[1]:stride]
+        best = q_grid[rows, cols].argmax(axis=2)
+        # Cells never updated have no preferred action
+        visited = q_grid[rows, cols].any(axis=2)
+        ax.quiver(cols[visited], rows[visited], ARROW_DX[best[visited]], ARROW_DY[best[visited]], color='white',
+                  angles='xy', scale_units='xy', scale=1.5 / stride, pivot='middle', width=0.003)
+        ax.set_title('Max Q-value and greedy action')
+        plt.colorbar(im, ax=ax)
+    else:
+        # Create a figure with 4 subplots (one for each action)
+        fig, axes = plt.subplots(2, 2, figsize=(12, 12))
+        axes = axes.flatten()
+        for action in range(4):
+            # Plot heatmap
+            im = axes[action].imshow(q_grid[:, :, action], cmap='viridis')
+            axes[action].set_title(f'Q-values for {ACTION_NAMES[action]}')
+            plt.colorbar(im, ax=axes[action])
+
     plt.tight_layout()
     plt.savefig(output_path)
-    plt.close() 
\ No newline at end of file
+    plt.close()
+
+
+class LiveLearningCurve:
+    # Learning curves that grow while training runs. Episodes are folded into buckets (min, max and mean
+    # of reward and steps, last success rate); when max_points buckets exist, neighbours are merged and
+    # the bucket size doubles, so memory and redraw cost stay bounded. refresh() only swaps the data of
+    # the existing line artists and asks the canvas for an idle redraw. The Figure is not tied to pyplot,
+    # so it can be embedded, e.g. with FigureCanvasTkAgg.
+    def __init__(self, max_points=1000):
+        self.max_points = max_points
+        self.bucket_size = 1
+        self._x = []
+        self._buckets = {name: [] for name in ('reward_min', 'reward_max', 'reward_mean',
+                                                'steps_min', 'steps_max', 'steps_mean', 'success_rate')}
+        self._count = 0
+        self._pending = None
+        self._last_success_rate = 0.0
+
+        self.fig = matplotlib_figure.Figure(figsize=(8, 9))
+        ax1, ax2, ax3 = self.fig.subplots(3, 1)
+        self.axes = (ax1, ax2, ax3)
+        self._lines = {
+            'reward_min': ax1.plot([], [], color='tab:blue', alpha=0.3, label='Episode Reward (min/max)')[0],
+            'reward_max': ax1.plot([], [], color='tab:blue', alpha=0.3)[0],
+            'reward_mean': ax1.plot([], [], color='red', label='Bucket Mean')[0],
+            'steps_min': ax2.plot([], [], color='orange', alpha=0.3, label='Steps per Episode (min/max)')[0],
+            'steps_max': ax2.plot([], [], color='orange', alpha=0.3)[0],
+            'steps_mean': ax2.plot([], [], color='red', label='Bucket Mean')[0],
+            'success_rate': ax3.plot([], [], color='green', label='Success Rate')[0],
+        }
+        for ax, title, ylabel in zip(self.axes, ('Rewards per Episode', 'Steps per Episode', 'Success Rate over Time'),
+                                     ('Total Reward', 'Number of Steps', 'Success Rate')):
+            ax.set_title(title)
+            ax.set_xlabel('Episode')
+            ax.set_ylabel(ylabel)
+            ax.grid(True)
+            ax.legend(loc='upper right')
+        self.fig.tight_layout()
+
+    def add(self, reward, steps, success_rate):
+        pending = self._pending
+        if pending is None:
+            self._pending = pending = [reward, reward, 0.0, steps, steps, 0.0, 0]
+        pending[0] = min(pending[0], reward)
+        pending[1] = max(pending[1], reward)
+        pending[2] += reward
+        pending[3] = min(pending[3], steps)
+        pending[4] = max(pending[4], steps)
+        pending[5] += steps
+        pending[6] += 1
+        self._count += 1
+        if pending[6] == self.bucket_size:
+            self._close_bucket(success_rate)
+        self._last_success_rate = success_rate
+
+    def refresh(self):
+        # Draw what has arrived so far, including the bucket still being filled
+        x = self._x
+        buckets = self._buckets
+        if self._pending is not None:
+            pending = self._pending
+            x = x + [self._count - 1]
+            extra = {'reward_min': pending[0], 'reward_max': pending[1], 'reward_mean': pending[2] / pending[6],
+                     'steps_min': pending[3], 'steps_max': pending[4], 'steps_mean': pending[5] / pending[6],
+                     'success_rate': self._last_success_rate}
+            buckets = {name: values + [extra[name]] for name, values in buckets.items()}
+        for name, line in self._lines.items():
+            line.set_data(x, buckets[name])
+        for ax in self.axes:
+            ax.relim()
+            ax.autoscale_view()
+        self.fig.canvas.draw_idle()
+
+    def _close_bucket(self, success_rate):
+        pending = self._pending
+        values = (pending[0], pending[1], pending[2] / pending[6], pending[3], pending[4], pending[5] / pending[6], success_rate)
+        for name, value in zip(self._buckets, values):
+            self._buckets[name].append(value)
+        self._x.append(self._count - 1)
+        self._pending = None
+        if len(self._x) >= self.max_points:
+            self._merge_buckets()
+
+    def _merge_buckets(self):
+        # Pairwise merge of full buckets: min of mins, max of maxes, mean of means, latest success rate
+        n = len(self._x) // 2 * 2
+        for name, values in self._buckets.items():
+            pairs = np.asarray(values[:n]).reshape(-1, 2)
+            if name.endswith('_min'):
+                merged = pairs.min(axis=1)
+            elif name.endswith('_max'):
+                merged = pairs.max(axis=1)
+            elif name.endswith('_mean'):
+                merged = pairs.mean(axis=1)
+            else:
+                merged = pairs[:, 1]
+            self._buckets[name] = merged.tolist() + values[n:]
+        self._x = self._x[1:n:2] + self._x[n:]
+        self.bucket_size *= 2